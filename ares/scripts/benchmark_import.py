@@ -0,0 +1,82 @@
+import csv
+from datetime import datetime
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from import_data import clean_value, compile_header, convert_row, parse_int
+
+def legacy_parse_date(date_str):
+    """Původní parse_date - strptime pro každé pole, bez cache"""
+    if not date_str:
+        return None
+    try:
+        return datetime.strptime(date_str, '%Y-%m-%d').date()
+    except ValueError:
+        try:
+            return datetime.strptime(date_str, '%d.%m.%Y').date()
+        except ValueError:
+            return None
+
+def legacy_row_to_values(cleaned_row):
+    """Původní převod řádku z csv.DictReader - každé pole se hledá podle názvu hlavičky"""
+    values = {
+        'ico': cleaned_row.get('IČO'),
+        'obchodni_jmeno': cleaned_row.get('Obchodní jméno/název'),
+        'datum_platnosti': legacy_parse_date(cleaned_row.get('Datum platnosti')),
+        'statisticka_pravni_forma_kod': parse_int(cleaned_row.get('Statistická právní forma (kód)')),
+        'statisticka_pravni_forma_nazev': cleaned_row.get('Statistická právní forma (název)'),
+        'velikostni_kategorie_kod': parse_int(cleaned_row.get('Velikostní kategorie dle počtu zaměstnanců (kód)')),
+        'velikostni_kategorie_nazev': cleaned_row.get('Velikostní kategorie dle počtu zaměstnanců (název)'),
+        'institucionalni_sektor_kod': parse_int(cleaned_row.get('Institucionální sektor (ESA 2010) (kód)')),
+        'institucionalni_sektor_nazev': cleaned_row.get('Institucionální sektor (ESA 2010) (název)'),
+        'kraj_kod': cleaned_row.get('Kraj (kód)'),
+        'kraj_nazev': cleaned_row.get('Kraj (název)'),
+        'okres_kod': cleaned_row.get('Okres (CZ-NUTS) (kód)'),
+        'okres_nazev': cleaned_row.get('Okres (CZ-NUTS) (název)'),
+        'obec_kod': parse_int(cleaned_row.get('Obec (kód)')),
+        'obec_nazev': cleaned_row.get('Obec (název)'),
+        'adresa_sidla': cleaned_row.get('Adresa sídla'),
+        'datum_vzniku': legacy_parse_date(cleaned_row.get('Datum vzniku')),
+        'datum_zaniku': legacy_parse_date(cleaned_row.get('Datum zániku')),
+        'zpusob_zaniku_kod': parse_int(cleaned_row.get('Způsob zániku (kód)')),
+        'zpusob_zaniku_nazev': cleaned_row.get('Způsob zániku (název)'),
+        'priznak': cleaned_row.get('Příznak'),
+        'hlavni_nace_kod': cleaned_row.get('Hlavní ekonomická činnost (CZ NACE) (kód)'),
+        'hlavni_nace_nazev': cleaned_row.get('Hlavní ekonomická činnost (CZ NACE) (název)')
+    }
+    return values
+
+def legacy_convert(csv_path):
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        return [legacy_row_to_values({key: clean_value(value) for key, value in row.items()})
+                for row in csv.DictReader(f)]
+
+def compiled_convert(csv_path):
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        plan = compile_header(next(reader))
+        return [convert_row(plan, row) for row in reader]
+
+def benchmark(csv_path, repeat=5):
+    """Porovná cenu převodu jednoho řádku před a po předkompilaci hlavičky"""
+    # Původní převod hash_zaznamu nepočítal, porovnávají se jen hodnoty sloupců
+    compiled_values = [{key: value for key, value in values.items() if key != 'hash_zaznamu'}
+                       for values in compiled_convert(csv_path)]
+    if legacy_convert(csv_path) != compiled_values:
+        raise ValueError("Předkompilovaný převod dává jiné hodnoty než původní")
+
+    rows = len(compiled_convert(csv_path))
+    legacy = min(timeit.repeat(lambda: legacy_convert(csv_path), number=1, repeat=repeat))
+    compiled = min(timeit.repeat(lambda: compiled_convert(csv_path), number=1, repeat=repeat))
+    print(f"Řádků: {rows}")
+    print(f"- Původní převod: {legacy / rows * 1e6:.1f} µs/řádek")
+    print(f"- Předkompilovaný převod (včetně hash_zaznamu): {compiled / rows * 1e6:.1f} µs/řádek")
+    print(f"- Zrychlení: {legacy / compiled:.2f}x")
+
+if __name__ == "__main__":
+    default_csv = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'res_export_2025-03-15-184623.csv')
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else default_csv)
@@ -0,0 +1,146 @@
+import argparse
+import time
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import Date, Float, Integer, cast, func, select
+
+from db import AccountingData, AresData, DatabaseConnection
+
+# pyarrow je potřeba jen pro export, import skriptu bez něj nesmí selhat
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+    ds = None
+
+# Výchozí složka exportu - v kořenovém adresáři projektu
+EXPORT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'export')
+
+# Textové sloupce s malým počtem opakujících se hodnot - ukládají se jako slovník
+# (v pandas se načtou jako category, v DuckDB jako ENUM-like sloupec)
+SLOVNIKOVE_SLOUPCE = {
+    'obchodni_jmeno',
+    'statisticka_pravni_forma_nazev',
+    'velikostni_kategorie_nazev',
+    'institucionalni_sektor_nazev',
+    'kraj_nazev',
+    'okres_nazev',
+    'obec_nazev',
+    'zpusob_zaniku_nazev',
+    'priznak',
+    'hlavni_nace_nazev',
+}
+
+def arrow_typ(column):
+    """Typ sloupce v Arrow podle typu sloupce v modelu"""
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Date):
+        return pa.date32()
+    if column.name in SLOVNIKOVE_SLOUPCE:
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.string()
+
+def sestav_schema(columns, partition_fields):
+    return pa.schema([pa.field(column.name, arrow_typ(column)) for column in columns] + partition_fields)
+
+def davky_z_dotazu(connection, query, schema, batch_size):
+    """Čte výsledek dotazu serverovým kurzorem a vrací ho po dávkách jako RecordBatch"""
+    result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+    for rows in result.partitions(batch_size):
+        arrays = []
+        for field, values in zip(schema, zip(*rows)):
+            if pa.types.is_dictionary(field.type):
+                arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def exportuj_dotaz(query, schema, partition_fields, cil, batch_size):
+    """Zapíše výsledek dotazu do Parquet souborů rozdělených podle partition_fields (hive styl)"""
+    file_format = ds.ParquetFileFormat()
+    file_options = file_format.make_write_options(
+        compression='zstd',
+        use_dictionary=[field.name for field in schema if pa.types.is_dictionary(field.type)],
+    )
+    pocet = 0
+
+    def pocitej(davky):
+        nonlocal pocet
+        for davka in davky:
+            pocet += davka.num_rows
+            yield davka
+
+    engine = DatabaseConnection.get_engine()
+    with engine.connect() as connection:
+        ds.write_dataset(
+            pocitej(davky_z_dotazu(connection, query, schema, batch_size)),
+            cil,
+            schema=schema,
+            format=file_format,
+            file_options=file_options,
+            partitioning=ds.partitioning(pa.schema(partition_fields), flavor='hive'),
+            basename_template='part-{i}.parquet',
+            existing_data_behavior='delete_matching',
+        )
+    return pocet
+
+def exportuj_ares(cil, batch_size):
+    """ares_data rozdělená podle kraje"""
+    columns = [column for column in AresData.__table__.columns if column.name != 'kraj_kod']
+    partition_fields = [pa.field('kraj_kod', pa.string())]
+    query = select(*columns, AresData.kraj_kod)
+    return exportuj_dotaz(query, sestav_schema(columns, partition_fields), partition_fields, cil, batch_size)
+
+def exportuj_accounting(cil, batch_size):
+    """accounting_data rozdělená podle roku účetního období a kraje sídla firmy"""
+    columns = list(AccountingData.__table__.columns)
+    partition_fields = [pa.field('rok', pa.int32()), pa.field('kraj_kod', pa.string())]
+    query = (
+        select(
+            *columns,
+            cast(func.extract('year', AccountingData.běžné_účetní_období), Integer).label('rok'),
+            AresData.kraj_kod,
+        )
+        .select_from(AccountingData)
+        .outerjoin(AresData, AresData.ico == AccountingData.ico)
+    )
+    return exportuj_dotaz(query, sestav_schema(columns, partition_fields), partition_fields, cil, batch_size)
+
+EXPORTY = {
+    'ares_data': exportuj_ares,
+    'accounting_data': exportuj_accounting,
+}
+
+def export_parquet(tabulky=tuple(EXPORTY), export_dir=EXPORT_DIR, batch_size=50000):
+    if pa is None:
+        print("Export do Parquet vyžaduje balík pyarrow (pip install -r web/requirements.txt)")
+        return False
+
+    for tabulka in tabulky:
+        cil = os.path.join(export_dir, tabulka)
+        print(f"Exportuji {tabulka} do {cil}...")
+        start = time.perf_counter()
+        try:
+            pocet = EXPORTY[tabulka](cil, batch_size)
+        except Exception as e:
+            print(f"Chyba při exportu tabulky {tabulka}: {e}")
+            return False
+        elapsed = time.perf_counter() - start
+        print(f"Exportováno {pocet} řádků za {elapsed:.1f} s ({pocet / elapsed if elapsed > 0 else 0:.0f} řádků/s)")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export tabulek ares_data a accounting_data do Parquet souborů")
+    parser.add_argument('--tabulka', dest='tabulky', action='append', choices=sorted(EXPORTY),
+                        help="Lze zadat opakovaně, bez zadání se exportují všechny tabulky")
+    parser.add_argument('--cil', default=EXPORT_DIR, help="Složka exportu")
+    parser.add_argument('--batch-size', type=int, default=50000)
+    args = parser.parse_args()
+    sys.exit(0 if export_parquet(args.tabulky or tuple(EXPORTY), args.cil, args.batch_size) else 1)
\ No newline at end of file
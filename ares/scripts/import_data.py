@@ -1,10 +1,23 @@
+import argparse
 import csv
-from datetime import datetime
+import hashlib
+import io
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
 
 import sys 
 import os 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from sqlalchemy import Date, Integer, String, Text, column, func, select, table, text
+from sqlalchemy.dialects.postgresql import distinct_on, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from dates import parse_date
 from db import AresData, DatabaseConnection
 
 def clean_value(value):
@@ -13,52 +26,119 @@ def clean_value(value):
         return value
     return value.replace('"', '').replace("'", '').replace('=', '')
 
-def import_from_csv(csv_path):
-    """Import dat z CSV souboru do databáze"""
+# Mapování hlaviček CSV exportu ARES na sloupce AresData
+CSV_COLUMNS = {
+    'IČO': 'ico',
+    'Obchodní jméno/název': 'obchodni_jmeno',
+    'Datum platnosti': 'datum_platnosti',
+    'Statistická právní forma (kód)': 'statisticka_pravni_forma_kod',
+    'Statistická právní forma (název)': 'statisticka_pravni_forma_nazev',
+    'Velikostní kategorie dle počtu zaměstnanců (kód)': 'velikostni_kategorie_kod',
+    'Velikostní kategorie dle počtu zaměstnanců (název)': 'velikostni_kategorie_nazev',
+    'Institucionální sektor (ESA 2010) (kód)': 'institucionalni_sektor_kod',
+    'Institucionální sektor (ESA 2010) (název)': 'institucionalni_sektor_nazev',
+    'Kraj (kód)': 'kraj_kod',
+    'Kraj (název)': 'kraj_nazev',
+    'Okres (CZ-NUTS) (kód)': 'okres_kod',
+    'Okres (CZ-NUTS) (název)': 'okres_nazev',
+    'Obec (kód)': 'obec_kod',
+    'Obec (název)': 'obec_nazev',
+    'Adresa sídla': 'adresa_sidla',
+    'Datum vzniku': 'datum_vzniku',
+    'Datum zániku': 'datum_zaniku',
+    'Způsob zániku (kód)': 'zpusob_zaniku_kod',
+    'Způsob zániku (název)': 'zpusob_zaniku_nazev',
+    'Příznak': 'priznak',
+    'Hlavní ekonomická činnost (CZ NACE) (kód)': 'hlavni_nace_kod',
+    'Hlavní ekonomická činnost (CZ NACE) (název)': 'hlavni_nace_nazev'
+}
+
+def column_converter(column_name):
+    """Vrátí převodní funkci podle typu sloupce AresData (None = text beze změny)"""
+    column_type = AresData.__table__.columns[column_name].type
+    if isinstance(column_type, Date):
+        return parse_date
+    if isinstance(column_type, Integer):
+        return parse_int
+    return None
+
+def compile_header(fieldnames):
+    """Jednou přeloží hlavičku CSV na seznam (index, sloupec, převodník)
+
+    Seznam je v pořadí sloupců AresData, sloupec chybějící v hlavičce má index None.
+    """
+    positions = {CSV_COLUMNS.get(header): index for index, header in enumerate(fieldnames)}
+    return [
+        (positions.get(column_name), column_name, column_converter(column_name))
+        for column_name in CSV_COLUMNS.values()
+    ]
+
+def convert_row(plan, row):
+    """Převede řádek z csv.reader jedním průchodem na slovník hodnot sloupců AresData"""
+    values = {}
+    row_length = len(row)
+    for index, column_name, converter in plan:
+        value = clean_value(row[index]) if index is not None and index < row_length else None
+        values[column_name] = converter(value) if converter is not None else value
+    values['hash_zaznamu'] = row_hash(values)
+    return values
+
+def read_rows(f):
+    """Vrátí generátor převedených řádků z otevřeného CSV souboru"""
+    reader = csv.reader(f)
+    plan = compile_header(next(reader, []))
+    return (convert_row(plan, row) for row in reader)
+
+def row_hash(values):
+    """Hash obsahu řádku pro přírůstkový import
+
+    Datum platnosti se nezapočítává, v každém exportu je u všech řádků stejné
+    (datum exportu) a každý řádek by se jinak jevil jako změněný.
+    """
+    content = '\x1f'.join(
+        '' if values[name] is None else str(values[name])
+        for name in values if name not in ('datum_platnosti', 'hash_zaznamu')
+    )
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+def import_from_csv(csv_path, mode='orm', batch_size=5000, workers=None):
+    """Import dat z CSV souboru do databáze
+
+    Args:
+        csv_path (str): Cesta k CSV exportu z registru ARES
+        mode (str): 'orm' - dotaz na existující záznam pro každý řádek,
+                    'bulk' - dávkový INSERT ... ON CONFLICT (ico) DO UPDATE,
+                    'copy' - COPY do dočasné tabulky a jeden INSERT ... SELECT,
+                    'incremental' - zapisuje jen nové a změněné řádky (podle hash_zaznamu),
+                    'parallel' - jako 'bulk', ale řádky čistí více procesů
+        batch_size (int): Počet řádků v jedné dávce (režimy 'bulk', 'incremental' a 'parallel')
+        workers (int): Počet procesů pro režim 'parallel' (výchozí počet jader)
+    """
+    if mode == 'bulk':
+        return import_from_csv_bulk(csv_path, batch_size)
+    if mode == 'copy':
+        return import_from_csv_copy(csv_path)
+    if mode == 'incremental':
+        return import_from_csv_incremental(csv_path, batch_size)
+    if mode == 'parallel':
+        return import_from_csv_parallel(csv_path, workers, batch_size)
+
     db_conn = DatabaseConnection()
     session = db_conn.get_session()
+    start = time.perf_counter()
     
     try:
         with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
             count = 0
             
-            for row in reader:
-                # Vyčištění všech hodnot v řádku
-                cleaned_row = {key: clean_value(value) for key, value in row.items()}
-                
-                ares_data = AresData(
-                    ico=cleaned_row.get('IČO'),
-                    obchodni_jmeno=cleaned_row.get('Obchodní jméno/název'),
-                    datum_platnosti=parse_date(cleaned_row.get('Datum platnosti')),
-                    statisticka_pravni_forma_kod=parse_int(cleaned_row.get('Statistická právní forma (kód)')),
-                    statisticka_pravni_forma_nazev=cleaned_row.get('Statistická právní forma (název)'),
-                    velikostni_kategorie_kod=parse_int(cleaned_row.get('Velikostní kategorie dle počtu zaměstnanců (kód)')),
-                    velikostni_kategorie_nazev=cleaned_row.get('Velikostní kategorie dle počtu zaměstnanců (název)'),
-                    institucionalni_sektor_kod=parse_int(cleaned_row.get('Institucionální sektor (ESA 2010) (kód)')),
-                    institucionalni_sektor_nazev=cleaned_row.get('Institucionální sektor (ESA 2010) (název)'),
-                    kraj_kod=cleaned_row.get('Kraj (kód)'),
-                    kraj_nazev=cleaned_row.get('Kraj (název)'),
-                    okres_kod=cleaned_row.get('Okres (CZ-NUTS) (kód)'),
-                    okres_nazev=cleaned_row.get('Okres (CZ-NUTS) (název)'),
-                    obec_kod=parse_int(cleaned_row.get('Obec (kód)')),
-                    obec_nazev=cleaned_row.get('Obec (název)'),
-                    adresa_sidla=cleaned_row.get('Adresa sídla'),
-                    datum_vzniku=parse_date(cleaned_row.get('Datum vzniku')),
-                    datum_zaniku=parse_date(cleaned_row.get('Datum zániku')),
-                    zpusob_zaniku_kod=parse_int(cleaned_row.get('Způsob zániku (kód)')),
-                    zpusob_zaniku_nazev=cleaned_row.get('Způsob zániku (název)'),
-                    priznak=cleaned_row.get('Příznak'),
-                    hlavni_nace_kod=cleaned_row.get('Hlavní ekonomická činnost (CZ NACE) (kód)'),
-                    hlavni_nace_nazev=cleaned_row.get('Hlavní ekonomická činnost (CZ NACE) (název)')
-                )
+            for values in read_rows(f):
+                ares_data = AresData(**values)
                 
                 existing = session.query(AresData).filter(AresData.ico == ares_data.ico).first()
                 if existing:
-                    for key, value in cleaned_row.items():
-                        mapped_key = map_csv_to_column(key)
-                        if hasattr(existing, mapped_key) and value:
-                            setattr(existing, mapped_key, parse_value(mapped_key, value))
+                    for column_name, value in values.items():
+                        if column_name != 'ico' and value not in (None, ''):
+                            setattr(existing, column_name, value)
                 else:
                     session.add(ares_data)
                 
@@ -69,6 +149,7 @@ def import_from_csv(csv_path):
             
             session.commit()
             print(f"Import dokončen, celkem zpracováno {count} záznamů")
+            print_throughput(count, start)
     
     except Exception as e:
         session.rollback()
@@ -76,16 +157,307 @@ def import_from_csv(csv_path):
     finally:
         session.close()
 
-def parse_date(date_str):
-    if not date_str:
-        return None
+def import_from_csv_bulk(csv_path, batch_size=5000):
+    """Dávkový import - jeden INSERT ... ON CONFLICT (ico) DO UPDATE na dávku řádků"""
+    db_conn = DatabaseConnection()
+    session = db_conn.get_session()
+    start = time.perf_counter()
+    
     try:
-        return datetime.strptime(date_str, '%Y-%m-%d').date()
-    except ValueError:
-        try:
-            return datetime.strptime(date_str, '%d.%m.%Y').date()
-        except ValueError:
-            return None
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            count = 0
+            # Klíčem je IČO, aby jedna dávka neobsahovala stejné IČO dvakrát
+            # (ON CONFLICT DO UPDATE nesmí změnit jeden řádek dvakrát), vyhrává poslední výskyt
+            batch = {}
+            
+            for values in read_rows(f):
+                batch[values['ico']] = values
+                
+                count += 1
+                if len(batch) >= batch_size:
+                    upsert_batch(session, list(batch.values()))
+                    session.commit()
+                    batch = {}
+                    print(f"Zpracováno {count} záznamů")
+                    print_throughput(count, start)
+            
+            if batch:
+                upsert_batch(session, list(batch.values()))
+            session.commit()
+            print(f"Import dokončen, celkem zpracováno {count} záznamů")
+            print_throughput(count, start)
+    
+    except Exception as e:
+        session.rollback()
+        print(f"Chyba při importu dat: {e}")
+    finally:
+        session.close()
+
+def import_from_csv_incremental(csv_path, batch_size=5000):
+    """Přírůstkový import - zapisuje jen řádky, jejichž hash obsahu se změnil
+
+    Na konci vypíše souhrn nových, změněných, nezměněných a zaniklých IČO
+    (zaniklá = jsou v databázi, ale v exportu chybí; z databáze se nemažou).
+    """
+    db_conn = DatabaseConnection()
+    session = db_conn.get_session()
+    start = time.perf_counter()
+    summary = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'vanished': 0}
+
+    try:
+        # Jediný dotaz na dvojice (IČO, hash) místo dotazu na každý řádek
+        known = dict(session.query(AresData.ico, AresData.hash_zaznamu))
+        existing_icos = set(known)
+        seen = set()
+
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            count = 0
+            batch = {}
+
+            for values in read_rows(f):
+                ico = values['ico']
+                seen.add(ico)
+                count += 1
+
+                if ico in known:
+                    if known[ico] == values['hash_zaznamu']:
+                        summary['unchanged'] += 1
+                        continue
+                    summary['updated'] += 1
+                else:
+                    summary['inserted'] += 1
+                known[ico] = values['hash_zaznamu']
+                batch[ico] = values
+
+                if len(batch) >= batch_size:
+                    upsert_batch(session, list(batch.values()))
+                    session.commit()
+                    batch = {}
+                    print(f"Zpracováno {count} záznamů")
+
+            if batch:
+                upsert_batch(session, list(batch.values()))
+            session.commit()
+
+        summary['vanished'] = len(existing_icos - seen)
+        print(f"Import dokončen, celkem zpracováno {count} záznamů")
+        print(f"- Nových: {summary['inserted']}")
+        print(f"- Změněných: {summary['updated']}")
+        print(f"- Beze změny: {summary['unchanged']}")
+        print(f"- Zaniklých (chybí v exportu): {summary['vanished']}")
+        print_throughput(count, start)
+        return summary
+
+    except Exception as e:
+        session.rollback()
+        print(f"Chyba při importu dat: {e}")
+    finally:
+        session.close()
+
+def import_from_csv_parallel(csv_path, workers=None, batch_size=5000, chunk_size=4 * 1024 * 1024):
+    """Paralelní import - čištění řádků běží v procesech, zápis v jednom vlákně
+
+    Soubor se rozdělí na bajtové úseky zarovnané na začátky záznamů, procesy
+    je parsují a výsledky se v původním pořadí předávají přes omezenou frontu
+    jedinému zapisovači. Výsledek je stejný jako u sekvenčního režimu 'bulk'.
+    Předpokládá, že hodnoty v uvozovkách neobsahují konce řádků (platí pro export ARES).
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    with open(csv_path, 'rb') as f:
+        fieldnames = next(csv.reader([f.readline().decode('utf-8')]))
+    chunks = find_chunks(csv_path, chunk_size)
+    print(f"Soubor rozdělen na {len(chunks)} úseků, {workers} procesů")
+
+    # Omezená fronta drží paměť konstantní, i když zapisovač nestíhá
+    row_queue = queue.Queue(maxsize=workers * 2)
+    result = {'count': 0, 'error': None}
+    writer = threading.Thread(target=write_from_queue, args=(row_queue, batch_size, start, result))
+    writer.start()
+
+    try:
+        # Pracovní procesy nesmí používat spojení zděděná z rodiče
+        with ProcessPoolExecutor(max_workers=workers, initializer=DatabaseConnection.dispose) as pool:
+            pending = deque()
+            for chunk_start, chunk_end in chunks:
+                pending.append(pool.submit(parse_chunk, csv_path, fieldnames, chunk_start, chunk_end))
+                if len(pending) >= workers * 2:
+                    row_queue.put(pending.popleft().result())
+            while pending:
+                row_queue.put(pending.popleft().result())
+    except Exception as e:
+        # Zapisovač po chybě neuloží rozpracovanou dávku a import se nehlásí jako dokončený
+        result['error'] = e
+        print(f"Chyba při parsování dat: {e}")
+    finally:
+        row_queue.put(None)
+        writer.join()
+
+    if result['error'] is None:
+        print(f"Import dokončen, celkem zpracováno {result['count']} záznamů")
+        print_throughput(result['count'], start)
+
+def find_chunks(csv_path, chunk_size):
+    """Rozdělí soubor (bez hlavičky) na bajtové úseky končící na konci řádku"""
+    file_size = os.path.getsize(csv_path)
+    with open(csv_path, 'rb') as f:
+        f.readline()
+        bounds = [f.tell()]
+        while bounds[-1] < file_size:
+            f.seek(min(bounds[-1] + chunk_size, file_size) - 1)
+            f.readline()
+            bounds.append(f.tell())
+    return list(zip(bounds, bounds[1:]))
+
+def parse_chunk(csv_path, fieldnames, chunk_start, chunk_end):
+    """Vyčistí a převede řádky jednoho úseku souboru (běží v pracovním procesu)"""
+    with open(csv_path, 'rb') as f:
+        f.seek(chunk_start)
+        data = f.read(chunk_end - chunk_start).decode('utf-8')
+    plan = compile_header(fieldnames)
+    return [convert_row(plan, row) for row in csv.reader(io.StringIO(data, newline=''))]
+
+def write_from_queue(row_queue, batch_size, start, result):
+    """Zapisovač paralelního importu - bere úseky z fronty a zapisuje je po dávkách"""
+    db_conn = DatabaseConnection()
+    session = db_conn.get_session()
+    batch = {}
+
+    try:
+        while True:
+            rows = row_queue.get()
+            if rows is None:
+                break
+            if result['error'] is not None:
+                # Po chybě jen vyprazdňujeme frontu, aby se producent nezablokoval
+                continue
+            try:
+                for values in rows:
+                    batch[values['ico']] = values
+                    if len(batch) >= batch_size:
+                        upsert_batch(session, list(batch.values()))
+                        session.commit()
+                        batch = {}
+                result['count'] += len(rows)
+                print(f"Zpracováno {result['count']} záznamů")
+                print_throughput(result['count'], start)
+            except Exception as e:
+                session.rollback()
+                result['error'] = e
+                print(f"Chyba při importu dat: {e}")
+
+        if batch and result['error'] is None:
+            upsert_batch(session, list(batch.values()))
+            session.commit()
+    except Exception as e:
+        session.rollback()
+        result['error'] = e
+        print(f"Chyba při importu dat: {e}")
+    finally:
+        session.close()
+
+def upsert_batch(session, rows):
+    """Vloží dávku řádků jedním INSERT ... ON CONFLICT (ico) DO UPDATE"""
+    insert = sqlite_insert if session.get_bind().dialect.name == 'sqlite' else pg_insert
+    session.execute(on_conflict_update(insert(AresData.__table__)), rows)
+
+def on_conflict_update(stmt):
+    """Doplní do INSERT klauzuli ON CONFLICT (ico) DO UPDATE
+
+    Stejně jako ORM režim přepisuje existující záznam jen neprázdnými hodnotami.
+    """
+    update_columns = {}
+    for col in AresData.__table__.columns:
+        if col.primary_key:
+            continue
+        new_value = stmt.excluded[col.name]
+        if isinstance(col.type, (String, Text)):
+            new_value = func.nullif(new_value, '')
+        update_columns[col.name] = func.coalesce(new_value, col)
+    return stmt.on_conflict_do_update(index_elements=['ico'], set_=update_columns)
+
+def import_from_csv_copy(csv_path):
+    """Import přes dočasnou tabulku plněnou pomocí COPY FROM STDIN
+
+    Vyčištěné řádky se streamují do dočasné tabulky a do ares_data se sloučí
+    jedním INSERT ... SELECT ... ON CONFLICT. Soubor se čte průběžně, takže
+    paměť nezávisí na jeho velikosti.
+    """
+    db_conn = DatabaseConnection()
+    engine = db_conn.get_engine()
+    columns = [col.name for col in AresData.__table__.columns]
+    start = time.perf_counter()
+
+    try:
+        with engine.begin() as connection, open(csv_path, 'r', encoding='utf-8') as f:
+            connection.execute(text(
+                "CREATE TEMP TABLE ares_data_staging (LIKE ares_data INCLUDING DEFAULTS) ON COMMIT DROP"
+            ))
+            # Pořadí řádku v souboru - při duplicitním IČO vyhrává poslední výskyt jako v ORM režimu
+            connection.execute(text("ALTER TABLE ares_data_staging ADD COLUMN poradi BIGSERIAL"))
+
+            stream = CopyStream(copy_line(values[name] for name in columns) for values in read_rows(f))
+            cursor = connection.connection.cursor()
+            cursor.copy_expert(f"COPY ares_data_staging ({', '.join(columns)}) FROM STDIN", stream)
+            print(f"Do dočasné tabulky nahráno {stream.count} záznamů")
+            print_throughput(stream.count, start)
+
+            staging = table('ares_data_staging', *[column(name) for name in columns], column('poradi'))
+            latest = select(*[staging.c[name] for name in columns]).ext(distinct_on(staging.c.ico)).order_by(
+                staging.c.ico, staging.c.poradi.desc()
+            )
+            stmt = on_conflict_update(pg_insert(AresData.__table__).from_select(columns, latest))
+            connection.execute(stmt)
+
+        print(f"Import dokončen, celkem zpracováno {stream.count} záznamů")
+        print_throughput(stream.count, start)
+
+    except Exception as e:
+        print(f"Chyba při importu dat: {e}")
+
+def copy_line(values):
+    """Zformátuje hodnoty jednoho řádku pro textový formát COPY"""
+    fields = []
+    for value in values:
+        if value is None:
+            fields.append('\\N')
+        elif isinstance(value, date):
+            fields.append(value.isoformat())
+        else:
+            fields.append(str(value).replace('\\', '\\\\').replace('\t', '\\t')
+                          .replace('\n', '\\n').replace('\r', '\\r'))
+    return '\t'.join(fields) + '\n'
+
+class CopyStream:
+    """Souborový objekt pro COPY FROM STDIN, který řádky generuje až při čtení"""
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._buffer = ''
+        self.count = 0
+
+    def read(self, size=-1):
+        chunks = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            chunks.append(line)
+            length += len(line)
+            self.count += 1
+        data = ''.join(chunks)
+        if size < 0:
+            self._buffer = ''
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+def print_throughput(count, start):
+    elapsed = time.perf_counter() - start
+    if elapsed > 0:
+        print(f"Rychlost: {count / elapsed:.0f} řádků/s ({elapsed:.1f} s)")
 
 def parse_int(int_str):
     if not int_str:
@@ -95,41 +467,13 @@ def parse_int(int_str):
     except ValueError:
         return None
 
-def map_csv_to_column(csv_header):
-    mapping = {
-        'IČO': 'ico',
-        'Obchodní jméno/název': 'obchodni_jmeno',
-        'Datum platnosti': 'datum_platnosti',
-        'Statistická právní forma (kód)': 'statisticka_pravni_forma_kod',
-        'Statistická právní forma (název)': 'statisticka_pravni_forma_nazev',
-        'Velikostní kategorie dle počtu zaměstnanců (kód)': 'velikostni_kategorie_kod',
-        'Velikostní kategorie dle počtu zaměstnanců (název)': 'velikostni_kategorie_nazev',
-        'Institucionální sektor (ESA 2010) (kód)': 'institucionalni_sektor_kod',
-        'Institucionální sektor (ESA 2010) (název)': 'institucionalni_sektor_nazev',
-        'Kraj (kód)': 'kraj_kod',
-        'Kraj (název)': 'kraj_nazev',
-        'Okres (CZ-NUTS) (kód)': 'okres_kod',
-        'Okres (CZ-NUTS) (název)': 'okres_nazev',
-        'Obec (kód)': 'obec_kod',
-        'Obec (název)': 'obec_nazev',
-        'Adresa sídla': 'adresa_sidla',
-        'Datum vzniku': 'datum_vzniku',
-        'Datum zániku': 'datum_zaniku',
-        'Způsob zániku (kód)': 'zpusob_zaniku_kod',
-        'Způsob zániku (název)': 'zpusob_zaniku_nazev',
-        'Příznak': 'priznak',
-        'Hlavní ekonomická činnost (CZ NACE) (kód)': 'hlavni_nace_kod',
-        'Hlavní ekonomická činnost (CZ NACE) (název)': 'hlavni_nace_nazev'
-    }
-    return mapping.get(csv_header, '')
-
-def parse_value(column_name, value):
-    if 'datum' in column_name:
-        return parse_date(value)
-    elif 'kod' in column_name and column_name != 'hlavni_nace_kod':
-        return parse_int(value)
-    return value
-
 if __name__ == "__main__":
     # Cesta k CSV souboru relativně ke kořenovému adresáři
-    import_from_csv(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'res_export_2025-03-15-184623.csv'))
\ No newline at end of file
+    default_csv = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'res_export_2025-03-15-184623.csv')
+    parser = argparse.ArgumentParser(description="Import exportu registru ARES do tabulky ares_data")
+    parser.add_argument('csv_path', nargs='?', default=default_csv)
+    parser.add_argument('--mode', choices=['orm', 'bulk', 'copy', 'incremental', 'parallel'], default='orm')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+    import_from_csv(args.csv_path, mode=args.mode, batch_size=args.batch_size, workers=args.workers)
@@ -12,7 +12,7 @@ from db import DatabaseConnection, EmployeeCountMapping
 def create_employee_count_mapping_table():
     db_conn = DatabaseConnection()
     session = db_conn.get_session()
-    engine = db_conn._engine
+    engine = db_conn.get_engine()
     
     try:
         print("Kontroluji existenci tabulky employee_count_mapping...")
@@ -12,7 +12,7 @@ from db import DatabaseConnection
 def clear_database():
     db_conn = DatabaseConnection()
     session = db_conn.get_session()
-    engine = db_conn._engine
+    engine = db_conn.get_engine()
     
     try:
         print("Mažu existující tabulky...")
@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+from datetime import date, timedelta
+
+from sqlalchemy import and_, case, func, literal, or_, select, update
+
+from db import AccountingData, AresData, CrawlStatus, DatabaseConnection
+import crawl_status
+
+# Výchozí pravidla pořadí stahování, lze přepsat JSON souborem (OBP_PRIORITY_RULES nebo --rules).
+# Body jednotlivých pravidel se sčítají, vyšší priorita se stahuje dřív.
+DEFAULT_RULES = {
+    # Fyzické osoby mimo obchodní rejstřík do Sbírky listin nic nezakládají - přeskočí se
+    'skip_legal_forms': [100, 101, 104, 105, 107, 424],
+    # Zaniklé firmy (vyplněné datum_zaniku) nové závěrky nepodávají
+    'skip_dissolved': True,
+    # Body podle statistické právní formy (kód -> body)
+    'legal_form': {'112': 50, '121': 50, '205': 30, '111': 20, '113': 20},
+    # Body podle velikostní kategorie, [nejnižší kód, body] - použije se první splněné
+    'size_category': [[310, 40], [210, 30], [120, 15], [110, 5]],
+    # Body podle kraje sídla (kraj_kod -> body), např. {"CZ010": 10}
+    'region': {},
+    # Body podle začátku kódu CZ NACE (prefix -> body), delší prefix má přednost
+    'nace_prefix': {},
+    # Stáří poslední zpracované závěrky: bez závěrky, [let od konce období, body]
+    'staleness_missing': 40,
+    'staleness_years': [[3, 30], [2, 20]],
+}
+
+def load_rules(path=None):
+    """Výchozí pravidla doplněná o pravidla ze souboru (klíče ze souboru přepíšou výchozí)"""
+    rules = dict(DEFAULT_RULES)
+    path = path or os.environ.get('OBP_PRIORITY_RULES')
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            rules.update(json.load(f))
+    return rules
+
+def skip_condition(rules):
+    """Podmínka nad AresData pro subjekty, u kterých závěrku nemá smysl hledat"""
+    conditions = []
+    if rules.get('skip_legal_forms'):
+        conditions.append(AresData.statisticka_pravni_forma_kod.in_(rules['skip_legal_forms']))
+    if rules.get('skip_dissolved'):
+        conditions.append(AresData.datum_zaniku.isnot(None))
+    return or_(*conditions) if conditions else None
+
+def _points(whens):
+    return case(*whens, else_=0) if whens else literal(0)
+
+def priority_expression(rules, today=None):
+    """Výraz nad AresData, který spočítá prioritu IČO podle pravidel"""
+    today = today or date.today()
+
+    legal_form = _points([
+        (AresData.statisticka_pravni_forma_kod == int(kod), body)
+        for kod, body in rules.get('legal_form', {}).items()
+    ])
+    size = _points([
+        (AresData.velikostni_kategorie_kod >= kod, body)
+        for kod, body in sorted(rules.get('size_category', []), reverse=True)
+    ])
+    region = _points([
+        (AresData.kraj_kod == kod, body)
+        for kod, body in rules.get('region', {}).items()
+    ])
+    nace = _points([
+        (AresData.hlavni_nace_kod.startswith(prefix), body)
+        for prefix, body in sorted(rules.get('nace_prefix', {}).items(), key=lambda item: -len(item[0]))
+    ])
+
+    latest_period = (
+        select(func.max(AccountingData.běžné_účetní_období))
+        .where(AccountingData.ico == AresData.ico)
+        .scalar_subquery()
+    )
+    staleness = _points(
+        [(latest_period.is_(None), rules.get('staleness_missing', 0))]
+        + [
+            (latest_period < today - timedelta(days=365 * years), body)
+            for years, body in sorted(rules.get('staleness_years', []), reverse=True)
+        ]
+    )
+    return legal_form + size + region + nace + staleness
+
+def prioritize(source, rules=None, only_new=True):
+    """Spočítá prioritu čekajících IČO zdroje a nestahovatelné subjekty označí jako skipped
+
+    Vše běží jako dva UPDATE v databázi, IČO se do Pythonu nenačítají. Při startu
+    scraperu se počítají jen nově přidaná a vrácená IČO (priority IS NULL), celá
+    fronta se přepočítá jen z příkazové řádky po změně pravidel (only_new=False).
+    Vrací (počet přeskočených, počet přepočítaných).
+    """
+    rules = rules or load_rules()
+    waiting = and_(
+        CrawlStatus.source == source,
+        CrawlStatus.status.in_([crawl_status.STATUS_PENDING, crawl_status.STATUS_FAILED]),
+    )
+    if only_new:
+        waiting = and_(waiting, CrawlStatus.priority.is_(None))
+    skipped = 0
+    with DatabaseConnection.session_scope() as session:
+        skip = skip_condition(rules)
+        if skip is not None:
+            skipped = session.execute(
+                update(CrawlStatus)
+                .where(waiting, CrawlStatus.ico.in_(select(AresData.ico).where(skip)))
+                .values(status=crawl_status.STATUS_SKIPPED)
+            ).rowcount
+        priority = (
+            select(priority_expression(rules))
+            .where(AresData.ico == CrawlStatus.ico)
+            .scalar_subquery()
+        )
+        updated = session.execute(
+            update(CrawlStatus)
+            .where(waiting)
+            .values(priority=func.coalesce(priority, 0))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    return skipped, updated
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Přepočet priority fronty stahování podle pravidel")
+    parser.add_argument('--source', default=crawl_status.SOURCE_JUSTICE,
+                        choices=[crawl_status.SOURCE_JUSTICE, crawl_status.SOURCE_WEB])
+    parser.add_argument('--rules', default=None, help="JSON soubor s pravidly (jinak OBP_PRIORITY_RULES)")
+    parser.add_argument('--only-new', action='store_true', help="Jen IČO bez spočítané priority")
+    args = parser.parse_args()
+
+    skipped, updated = prioritize(args.source, load_rules(args.rules), args.only_new)
+    print(f"Přeskočeno {skipped} IČO bez závěrek, přepočítána priorita {updated} IČO")
\ No newline at end of file
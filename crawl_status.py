@@ -0,0 +1,256 @@
+import hashlib
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, exists, func, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from db import CRAWL_CLAIMABLE_STATUSES, AccountingData, AresData, CrawlStatus, DatabaseConnection
+
+# Zdroje - každý scraper má vlastní frontu nad stejnou tabulkou
+SOURCE_JUSTICE = 'justice'
+SOURCE_WEB = 'web'
+
+# Stavy záznamu
+STATUS_PENDING = 'pending'          # Čeká na zpracování
+STATUS_IN_PROGRESS = 'in_progress'  # Převzal ho některý pracovník
+STATUS_DONE = 'done'                # Dokument stažen / web nalezen
+STATUS_NO_DOCUMENT = 'no_document'  # Zpracováno, ale nic k stažení
+STATUS_FAILED = 'failed'            # Chyba, zkusí se znovu do MAX_ATTEMPTS
+STATUS_SKIPPED = 'skipped'          # Subjekt závěrky nepodává (viz crawl_priority)
+
+MAX_ATTEMPTS = 3
+# Převzatý záznam, který nikdo nedokončil (pád pracovníka), se po této době uvolní
+LEASE_TIMEOUT = timedelta(hours=1)
+
+# Závěrka se zveřejňuje nejpozději 12 měsíců po konci účetního období (§ 21a zákona
+# o účetnictví), k tomu rezerva na zapsání listiny soudem do Sbírky listin
+FILING_DEADLINE = timedelta(days=365)
+FILING_GRACE = timedelta(days=30)
+# Firma, která po lhůtě nic nového nepodala, se zkusí znovu až po tomto intervalu
+RECHECK_INTERVAL = timedelta(days=90)
+# Firma bez dokumentu ve Sbírce listin se zkusí znovu nejdřív po tomto intervalu
+NO_DOCUMENT_INTERVAL = timedelta(days=365)
+
+def _add_year(d):
+    # 29. 2. -> 28. 2. následujícího roku
+    return d.replace(year=d.year + 1, day=min(d.day, 28) if d.month == 2 else d.day)
+
+def next_check_date(latest_period, filed_at, today=None):
+    """Den, od kterého má smysl hledat novější závěrku (None = neznámo, znovu se nehledá)
+
+    Se známým obdobím je to lhůta pro zveřejnění závěrky za následující rok, bez něj
+    rok od posledního podání. Prošlá lhůta (firma podává pozdě) se posune o RECHECK_INTERVAL.
+    """
+    today = today or date.today()
+    if latest_period is not None:
+        due = _add_year(latest_period) + FILING_DEADLINE + FILING_GRACE
+    elif filed_at is not None:
+        due = _add_year(filed_at)
+    else:
+        return None
+    return max(due, today + RECHECK_INTERVAL)
+
+def no_document_check_date(datum_vzniku, today=None):
+    """Den další kontroly IČO, u kterého se žádná závěrka nenašla
+
+    Nová firma musí první závěrku zveřejnit do lhůty po konci roku vzniku,
+    ostatní se zkusí znovu po NO_DOCUMENT_INTERVAL.
+    """
+    today = today or date.today()
+    if datum_vzniku is not None:
+        due = date(datum_vzniku.year, 12, 31) + FILING_DEADLINE + FILING_GRACE
+        if due > today:
+            return due
+    return today + NO_DOCUMENT_INTERVAL
+
+def _insert(session):
+    return sqlite_insert if session.get_bind().dialect.name == 'sqlite' else pg_insert
+
+def seed_pending(source, *criteria):
+    """Založí stav pending pro všechna IČO z ares_data, která ve frontě zdroje ještě nejsou
+
+    Jeden INSERT ... SELECT s anti-joinem na straně databáze, IČO se nenačítají do Pythonu.
+    criteria omezují vybraná IČO (výrazy nad AresData). Vrací počet nových záznamů.
+    """
+    missing = select(AresData.ico, literal(source), literal(STATUS_PENDING), literal(0)).where(
+        ~exists().where(and_(CrawlStatus.ico == AresData.ico, CrawlStatus.source == source)),
+        *criteria,
+    )
+    with DatabaseConnection.session_scope() as session:
+        stmt = _insert(session)(CrawlStatus.__table__).from_select(
+            ['ico', 'source', 'status', 'attempts'], missing
+        ).on_conflict_do_nothing()
+        return session.execute(stmt).rowcount
+
+def has_entries(source):
+    """Zda už fronta zdroje obsahuje nějaký záznam"""
+    with DatabaseConnection.session_scope() as session:
+        return session.scalar(select(exists().where(CrawlStatus.source == source)))
+
+def mark_many(source, icos, status, filed_at=None, today=None):
+    """Nastaví stav více IČO najednou (převod starého lokálního stavu)
+
+    Další kontrola se naplánuje stejně jako v mark_result: hotovým IČO z data podání
+    (filed_at: ico -> datum), IČO bez dokumentu z data vzniku firmy. Existující záznam
+    se změní jen ze stavu pending, výsledky jiných pracovníků zůstanou.
+    """
+    if not icos:
+        return 0
+    filed_at = filed_at or {}
+    today = today or date.today()
+    with DatabaseConnection.session_scope() as session:
+        if status == STATUS_NO_DOCUMENT:
+            datum_vzniku = dict(session.execute(
+                select(AresData.ico, AresData.datum_vzniku).where(AresData.ico.in_(icos))
+            ).all())
+        rows = []
+        for ico in icos:
+            next_check = None
+            if status == STATUS_DONE:
+                next_check = next_check_date(None, filed_at.get(ico), today)
+            elif status == STATUS_NO_DOCUMENT:
+                next_check = no_document_check_date(datum_vzniku.get(ico), today)
+            rows.append({'ico': ico, 'source': source, 'status': status, 'attempts': 0,
+                         'filed_at': filed_at.get(ico), 'next_check': next_check})
+        stmt = _insert(session)(CrawlStatus.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['ico', 'source'],
+            set_={
+                'status': stmt.excluded.status,
+                'filed_at': stmt.excluded.filed_at,
+                'next_check': stmt.excluded.next_check,
+            },
+            where=CrawlStatus.__table__.c.status == STATUS_PENDING,
+        )
+        session.execute(stmt, rows)
+    return len(rows)
+
+def claim_batch(source, batch_size=10):
+    """Převezme další dávku IČO ke zpracování a vrátí jejich seznam
+
+    Řádky se zamykají FOR UPDATE SKIP LOCKED, takže pracovníci na různých strojích
+    dostanou různá IČO a na sebe nečekají. Kromě pending se znovu vydávají chybné
+    záznamy (do MAX_ATTEMPTS) a převzaté záznamy s prošlou lhůtou. Nejdřív se vydávají
+    IČO s nejvyšší prioritou (crawl_priority), při shodě nejdéle nezkoušená.
+    """
+    now = datetime.now()
+    claimable = or_(
+        CrawlStatus.status == STATUS_PENDING,
+        and_(CrawlStatus.status == STATUS_FAILED, CrawlStatus.attempts < MAX_ATTEMPTS),
+        and_(CrawlStatus.status == STATUS_IN_PROGRESS, CrawlStatus.last_attempt < now - LEASE_TIMEOUT),
+    )
+    with DatabaseConnection.session_scope() as session:
+        icos = session.execute(
+            select(CrawlStatus.ico)
+            # Podmínka částečného indexu ix_crawl_status_claim, aby ho plánovač použil
+            .where(CrawlStatus.source == source, CrawlStatus.status.in_(CRAWL_CLAIMABLE_STATUSES), claimable)
+            .order_by(CrawlStatus.priority.desc().nulls_last(), CrawlStatus.last_attempt.asc().nulls_first())
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if icos:
+            session.execute(
+                update(CrawlStatus)
+                .where(CrawlStatus.source == source, CrawlStatus.ico.in_(icos))
+                .values(status=STATUS_IN_PROGRESS, attempts=CrawlStatus.attempts + 1, last_attempt=now)
+            )
+    return icos
+
+def mark_result(ico, source, status, document_path=None, checksum=None, filed_at=None):
+    """Zapíše výsledek zpracování jednoho IČO
+
+    U staženého dokumentu (done) se z data podání a posledního známého období
+    naplánuje další kontrola, u IČO bez dokumentu (no_document) z data vzniku firmy.
+    """
+    values = {'status': status}
+    if document_path is not None:
+        values['document_path'] = document_path
+        values['checksum'] = checksum
+    if filed_at is not None:
+        values['filed_at'] = filed_at
+    with DatabaseConnection.session_scope() as session:
+        if status == STATUS_DONE:
+            latest_period = session.scalar(
+                select(CrawlStatus.latest_period).where(CrawlStatus.ico == ico, CrawlStatus.source == source)
+            )
+            values['next_check'] = next_check_date(latest_period, filed_at)
+        elif status == STATUS_NO_DOCUMENT:
+            datum_vzniku = session.scalar(select(AresData.datum_vzniku).where(AresData.ico == ico))
+            values['next_check'] = no_document_check_date(datum_vzniku)
+        session.execute(
+            update(CrawlStatus)
+            .where(CrawlStatus.ico == ico, CrawlStatus.source == source)
+            .values(**values)
+        )
+
+def release(ico, source):
+    """Vrátí převzaté IČO zpět do fronty (problém s proxy/CAPTCHA, ne chyba firmy)"""
+    with DatabaseConnection.session_scope() as session:
+        session.execute(
+            update(CrawlStatus)
+            .where(CrawlStatus.ico == ico, CrawlStatus.source == source)
+            .values(status=STATUS_PENDING, attempts=CrawlStatus.attempts - 1)
+        )
+
+def sync_latest_periods(source, batch_size=1000):
+    """Převezme do fronty poslední běžné_účetní_období z accounting_data a přeplánuje kontrolu
+
+    Vybírají se jen hotová IČO, u kterých přibylo novější období, takže v ustáleném
+    stavu dotaz nevrátí skoro nic. Vrací počet aktualizovaných IČO.
+    """
+    latest = (
+        select(func.max(AccountingData.běžné_účetní_období))
+        .where(AccountingData.ico == CrawlStatus.ico)
+        .scalar_subquery()
+    )
+    query = select(CrawlStatus.ico, CrawlStatus.filed_at, latest).where(
+        CrawlStatus.source == source,
+        CrawlStatus.status == STATUS_DONE,
+        latest.isnot(None),
+        or_(CrawlStatus.latest_period.is_(None), CrawlStatus.latest_period < latest),
+    )
+    today = date.today()
+    updated = 0
+    with DatabaseConnection.session_scope() as session:
+        changed = session.execute(query).all()
+        for start in range(0, len(changed), batch_size):
+            rows = [
+                {
+                    'ico': ico,
+                    'source': source,
+                    'latest_period': latest_period,
+                    'next_check': next_check_date(latest_period, filed_at, today),
+                }
+                for ico, filed_at, latest_period in changed[start:start + batch_size]
+            ]
+            session.execute(update(CrawlStatus), rows)
+            updated += len(rows)
+    return updated
+
+def requeue_due(source, today=None):
+    """Vrátí do fronty hotová IČO a IČO bez dokumentu, u kterých už může být podaná
+    (novější) závěrka
+
+    Ostatní se znovu nestahují. Vrací počet vrácených IČO.
+    """
+    today = today or date.today()
+    with DatabaseConnection.session_scope() as session:
+        return session.execute(
+            update(CrawlStatus)
+            .where(
+                CrawlStatus.source == source,
+                CrawlStatus.status.in_([STATUS_DONE, STATUS_NO_DOCUMENT]),
+                CrawlStatus.next_check <= today,
+            )
+            # Priorita se spočítá znovu (stáří závěrky se změnilo), viz crawl_priority
+            .values(status=STATUS_PENDING, attempts=0, priority=None)
+        ).rowcount
+
+def file_checksum(path):
+    """SHA-256 obsahu souboru"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
\ No newline at end of file
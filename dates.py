@@ -0,0 +1,38 @@
+from datetime import date, datetime
+from functools import lru_cache
+
+# Export ARES i účetní závěrky opakují stále stejná data (např. Datum platnosti
+# je u všech řádků exportu stejné), proto se výsledky pamatují
+DATE_CACHE_SIZE = 4096
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(date_str):
+    """Převede datum ve formátu RRRR-MM-DD nebo D.M.RRRR na date, jinak vrátí None"""
+    if not date_str:
+        return None
+
+    # Rychlá cesta pro oba známé formáty, strptime jen jako záloha pro ostatní případy
+    if len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-' and date_str.replace('-', '').isdigit():
+        try:
+            return date.fromisoformat(date_str)
+        except ValueError:
+            return None
+
+    parts = date_str.split('.')
+    if (len(parts) == 3 and 1 <= len(parts[0]) <= 2 and 1 <= len(parts[1]) <= 2 and len(parts[2]) == 4
+            and parts[0].isdigit() and parts[1].isdigit() and parts[2].isdigit()):
+        try:
+            return date(int(parts[2]), int(parts[1]), int(parts[0]))
+        except ValueError:
+            return None
+
+    return _parse_date_strptime(date_str)
+
+def _parse_date_strptime(date_str):
+    try:
+        return datetime.strptime(date_str, '%Y-%m-%d').date()
+    except ValueError:
+        try:
+            return datetime.strptime(date_str, '%d.%m.%Y').date()
+        except ValueError:
+            return None
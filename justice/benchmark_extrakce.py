@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+import tracemalloc
+
+import pdfplumber
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from uzaverky3 import UZAVERKY_DIR, extrahuj_stranky
+
+def puvodni_extrakce(pdf_path):
+    """Původní extrakce - extract_text() dvakrát na každou stránku, všechny stránky"""
+    with pdfplumber.open(pdf_path) as pdf:
+        return [page.extract_text() for page in pdf.pages if page.extract_text()]
+
+def zmer(funkce, pdf_paths, opakovani):
+    """Vrátí nejlepší čas (s) a špičku alokované paměti (MB) pro zpracování všech souborů"""
+    nejlepsi = None
+    for _ in range(opakovani):
+        start = time.perf_counter()
+        for pdf_path in pdf_paths:
+            funkce(pdf_path)
+        trvani = time.perf_counter() - start
+        nejlepsi = trvani if nejlepsi is None else min(nejlepsi, trvani)
+
+    tracemalloc.start()
+    for pdf_path in pdf_paths:
+        funkce(pdf_path)
+    _, spicka = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return nejlepsi, spicka / 1024 / 1024
+
+def benchmark(pdf_paths, opakovani=3):
+    print(f"Souborů: {len(pdf_paths)}, opakování: {opakovani}")
+    for nazev, funkce in [("Původní extrakce", puvodni_extrakce), ("Jednoprůchodová extrakce", extrahuj_stranky)]:
+        trvani, pamet = zmer(funkce, pdf_paths, opakovani)
+        print(f"- {nazev}: {trvani:.3f} s, špička paměti {pamet:.1f} MB")
+
+if __name__ == "__main__":
+    adresar = sys.argv[1] if len(sys.argv) > 1 else UZAVERKY_DIR
+    benchmark(sorted(os.path.join(adresar, f) for f in os.listdir(adresar) if f.lower().endswith('.pdf')))
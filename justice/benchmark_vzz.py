@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from uzaverky3 import UZAVERKY_DIR, extract_text_from_pdf, mapa_vzz, zpracuj_vzz
+
+def puvodni_vzz(data_vzz_lines):
+    """Původní zpracování VZZ - pro každý klíč mapy se prochází všechny řádky"""
+    data_vzz = {}
+    for klíč, hodnota in mapa_vzz.items():
+        matching_lines = [line for line in data_vzz_lines if klíč in line]
+        if matching_lines:
+            cisla = []
+            for s in matching_lines[0].split():
+                try:
+                    cisla.append(int(s.replace(" ", "")))
+                except ValueError:
+                    continue
+            if len(cisla) >= 2:
+                data_vzz[hodnota] = {"běžné": cisla[0], "minulé": cisla[1]}
+    return data_vzz
+
+def vzz_radky(text):
+    lines = text.split('\n')
+    index_vzz = next((i for i, line in enumerate(lines) if any(klíč in line for klíč in ["Výkaz zisku", "Hospodaření", "Výnosy", "Náklady"])), -1)
+    return lines[index_vzz:] if index_vzz != -1 else []
+
+def benchmark(pdf_paths, opakovani=200):
+    """Porovná propustnost původní smyčky a jednoprůchodového zpracování VZZ"""
+    korpus = [vzz_radky(extract_text_from_pdf(pdf_path)) for pdf_path in pdf_paths]
+    korpus = [radky for radky in korpus if radky]
+    pocet_radku = sum(len(radky) for radky in korpus) * opakovani
+    print(f"Výkazů: {len(korpus)} x {opakovani} opakování, řádků celkem: {pocet_radku}")
+
+    for nazev, funkce in [("Původní smyčka", puvodni_vzz), ("Jednoprůchodové zpracování", zpracuj_vzz)]:
+        start = time.perf_counter()
+        for _ in range(opakovani):
+            for radky in korpus:
+                funkce(radky)
+        trvani = time.perf_counter() - start
+        print(f"- {nazev}: {trvani:.3f} s, {len(korpus) * opakovani / trvani:.0f} výkazů/s, {pocet_radku / trvani:.0f} řádků/s")
+
+    # Rozdíly ve výsledcích (původní smyčka nachází klíče i uvnitř jiného textu)
+    for radky in korpus:
+        puvodni, nove = puvodni_vzz(radky), zpracuj_vzz(radky)
+        for sloupec in sorted(set(puvodni) | set(nove)):
+            if puvodni.get(sloupec) != nove.get(sloupec):
+                print(f"  {sloupec}: původně {puvodni.get(sloupec)}, nově {nove.get(sloupec)}")
+
+if __name__ == "__main__":
+    adresar = sys.argv[1] if len(sys.argv) > 1 else UZAVERKY_DIR
+    benchmark(sorted(os.path.join(adresar, f) for f in os.listdir(adresar) if f.lower().endswith('.pdf')))
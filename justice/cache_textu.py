@@ -0,0 +1,45 @@
+import gzip
+import hashlib
+import json
+import os
+
+# Výchozí složka cache - vedle stažených závěrek
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "uzaverky", ".text_cache")
+
+def hash_souboru(pdf_path):
+    """SHA-256 obsahu souboru (klíč cache nezávislý na názvu souboru)"""
+    digest = hashlib.sha256()
+    with open(pdf_path, 'rb') as f:
+        for blok in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(blok)
+    return digest.hexdigest()
+
+def cesta_v_cache(digest, verze, cache_dir=CACHE_DIR):
+    # Podsložky podle prvních dvou znaků, aby jedna složka neměla statisíce souborů
+    return os.path.join(cache_dir, digest[:2], f"{digest}_v{verze}.json.gz")
+
+def nacti_stranky(digest, verze, cache_dir=CACHE_DIR):
+    """Vrátí uložený text stránek nebo None, pokud v cache není"""
+    cesta = cesta_v_cache(digest, verze, cache_dir)
+    if not os.path.exists(cesta):
+        return None
+    try:
+        with gzip.open(cesta, 'rt', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Poškozený záznam v cache {cesta}: {e}")
+        return None
+
+def uloz_stranky(digest, verze, stranky, cache_dir=CACHE_DIR):
+    """Uloží text stránek do cache (zápis přes dočasný soubor, takže je atomický)"""
+    cesta = cesta_v_cache(digest, verze, cache_dir)
+    os.makedirs(os.path.dirname(cesta), exist_ok=True)
+    docasna = f"{cesta}.{os.getpid()}.tmp"
+    try:
+        with gzip.open(docasna, 'wt', encoding='utf-8') as f:
+            json.dump(stranky, f, ensure_ascii=False)
+        os.replace(docasna, cesta)
+    except OSError as e:
+        print(f"Chyba při ukládání do cache {cesta}: {e}")
+        if os.path.exists(docasna):
+            os.remove(docasna)
@@ -0,0 +1,216 @@
+import argparse
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from uzaverky3 import CHYBA_BEZ_TEXTU, REZIM_TEXT, REZIMY, UZAVERKY_DIR, uloz_davku, zpracuj_soubor
+from db import DatabaseConnection
+
+# Soubor s názvy již zpracovaných PDF - po pádu nebo přerušení se pokračuje od něj
+SOUBOR_POSTUPU = os.path.join(UZAVERKY_DIR, ".postup_zpracovani.txt")
+
+# Soubor s neúspěšnými pokusy (název a čas změny PDF) - opakovaně chybné PDF se přeskočí
+SOUBOR_CHYB = os.path.join(UZAVERKY_DIR, ".chyby_zpracovani.txt")
+# Po tolika chybách se PDF přeskakuje, dokud se nezmění (nový čas změny souboru)
+MAX_POKUSU = 3
+
+# Značka konce pro zapisovací vlákno
+KONEC = None
+
+def nacti_postup(soubor_postupu=SOUBOR_POSTUPU):
+    """Vrátí množinu názvů souborů, které už jsou zpracované"""
+    if not os.path.exists(soubor_postupu):
+        return set()
+    with open(soubor_postupu, 'r', encoding='utf-8') as f:
+        # Poslední řádek může být useknutý pádem, ten se zpracuje znovu
+        return {radek.rstrip('\n') for radek in f if radek.endswith('\n')}
+
+def zapis_postup(soubor, nazvy):
+    """Připíše zpracované soubory do souboru postupu a vynutí zápis na disk"""
+    for nazev in nazvy:
+        soubor.write(nazev + '\n')
+    soubor.flush()
+    os.fsync(soubor.fileno())
+
+def nacti_chyby(soubor_chyb=SOUBOR_CHYB):
+    """Vrátí {název souboru: (počet chyb, čas změny)}, počítají se jen chyby poslední verze souboru"""
+    chyby = {}
+    if not os.path.exists(soubor_chyb):
+        return chyby
+    with open(soubor_chyb, 'r', encoding='utf-8') as f:
+        for radek in f:
+            if not radek.endswith('\n'):
+                continue
+            nazev, _, mtime = radek.rstrip('\n').rpartition('\t')
+            try:
+                mtime = float(mtime)
+            except ValueError:
+                continue
+            pocet, predchozi = chyby.get(nazev, (0, mtime))
+            chyby[nazev] = (pocet + 1 if predchozi == mtime else 1, mtime)
+    return chyby
+
+def vyrazene_soubory(chyby, max_pokusu=MAX_POKUSU):
+    """Soubory, které selhaly max_pokusu krát: {název: čas změny chybné verze}"""
+    return {nazev: mtime for nazev, (pocet, mtime) in chyby.items() if pocet >= max_pokusu}
+
+def najdi_soubory(adresar, hotove, vyrazene=None):
+    """Postupně vrací cesty k PDF, které ještě nejsou zpracované (bez načtení celé složky)
+
+    Vyřazené soubory se přeskočí, dokud se jejich čas změny neliší od chybné verze.
+    """
+    vyrazene = vyrazene or {}
+    with os.scandir(adresar) as polozky:
+        for polozka in polozky:
+            if not (polozka.is_file() and polozka.name.lower().endswith('.pdf')) or polozka.name in hotove:
+                continue
+            if polozka.name in vyrazene and polozka.stat().st_mtime == vyrazene[polozka.name]:
+                continue
+            yield polozka.path
+
+def zapisovac(fronta, batch_size, soubor_postupu, statistiky, adresar=UZAVERKY_DIR, soubor_chyb=SOUBOR_CHYB):
+    """Jediné vlákno, které ukládá do databáze - výsledky bere z fronty a ukládá po dávkách
+
+    Soubory se zapíšou do postupu až po uložení jejich dávky, takže se po pádu
+    nic neztratí. Pokud se dávka neuloží celá, její soubory se do postupu nezapíšou
+    a při dalším běhu se zpracují znovu. Stejně tak soubory s výjimkou při zpracování
+    (rozepsané nebo zamčené PDF), do postupu jdou jen PDF bez textu. Výjimky se
+    zapisují do souboru chyb, po MAX_POKUSU chybách se soubor přestane zkoušet.
+    """
+    rows = []
+    nazvy = []
+    bez_textu = []
+    s_vyjimkou = []
+
+    def uloz():
+        saved = uloz_davku(rows) if rows else 0
+        statistiky['ulozeno'] += saved
+        # PDF bez textu se zapisují vždy, opakování by nepomohlo
+        zapis_postup(postup, (nazvy if saved == len(rows) else []) + bez_textu)
+        if s_vyjimkou:
+            zapis_postup(chyby, s_vyjimkou)
+        rows.clear()
+        nazvy.clear()
+        bez_textu.clear()
+        s_vyjimkou.clear()
+
+    with open(soubor_postupu, 'a', encoding='utf-8') as postup, open(soubor_chyb, 'a', encoding='utf-8') as chyby:
+        while True:
+            polozka = fronta.get()
+            if polozka is KONEC:
+                break
+            filename, row, duration, error = polozka
+            statistiky['zpracovano'] += 1
+            if error:
+                statistiky['chyby'][filename] = error
+                print(f"[{statistiky['zpracovano']}] {filename}: CHYBA za {duration:.2f} s - {error}")
+                if error == CHYBA_BEZ_TEXTU:
+                    bez_textu.append(filename)
+                else:
+                    try:
+                        mtime = os.path.getmtime(os.path.join(adresar, filename))
+                    except OSError:
+                        mtime = 0.0
+                    s_vyjimkou.append(f"{filename}\t{mtime!r}")
+            else:
+                rows.append(row)
+                nazvy.append(filename)
+                print(f"[{statistiky['zpracovano']}] {filename}: {duration:.2f} s")
+
+            if len(nazvy) + len(bez_textu) + len(s_vyjimkou) >= batch_size:
+                uloz()
+        if nazvy or bez_textu or s_vyjimkou:
+            uloz()
+
+def _inicializuj_proces():
+    # Ctrl+C dostanou i pracovní procesy, přerušení ale řídí hlavní proces
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Spojení zděděná z rodiče patří zapisovači, proces si případně otevře vlastní
+    DatabaseConnection.dispose()
+
+def spust_pipeline(adresar=UZAVERKY_DIR, workers=None, batch_size=200, rezim=REZIM_TEXT,
+                   soubor_postupu=SOUBOR_POSTUPU, velikost_fronty=None, soubor_chyb=SOUBOR_CHYB,
+                   max_pokusu=MAX_POKUSU):
+    """Zpracuje složku závěrek jako proud: hledání souborů -> pool procesů -> zapisovač
+
+    Rozpracovaných souborů i výsledků ve frontě je nejvýš pevný počet, takže paměť
+    nezávisí na velikosti archivu. Při Ctrl+C nebo SIGTERM se nové soubory přestanou
+    zadávat, rozpracované se dokončí a uloží a postup zůstane uložený pro další běh.
+    """
+    workers = workers or os.cpu_count() or 1
+    velikost_fronty = velikost_fronty or batch_size * 2
+    max_rozpracovanych = workers * 2
+
+    hotove = nacti_postup(soubor_postupu)
+    vyrazene = vyrazene_soubory(nacti_chyby(soubor_chyb), max_pokusu)
+    print(f"Již zpracováno {len(hotove)} souborů, vyřazeno {len(vyrazene)} opakovaně chybných, pokračuji v {workers} procesech")
+
+    zastavit = threading.Event()
+
+    def preruseni(signum, frame):
+        if not zastavit.is_set():
+            print("\nPřerušení - dokončuji rozpracované soubory a ukládám postup...")
+        zastavit.set()
+
+    puvodni_obsluhy = {sig: signal.signal(sig, preruseni) for sig in (signal.SIGINT, signal.SIGTERM)}
+
+    fronta = queue.Queue(maxsize=velikost_fronty)
+    statistiky = {'zpracovano': 0, 'ulozeno': 0, 'chyby': {}}
+    vlakno = threading.Thread(target=zapisovac, args=(fronta, batch_size, soubor_postupu, statistiky, adresar, soubor_chyb))
+    vlakno.start()
+
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_inicializuj_proces) as pool:
+            rozpracovane = set()
+            for pdf_path in najdi_soubory(adresar, hotove, vyrazene):
+                if zastavit.is_set():
+                    break
+                if len(rozpracovane) >= max_rozpracovanych:
+                    # Čeká se na volný proces; plná fronta zapisovače zdrží i tohle vlákno
+                    hotove_futures, rozpracovane = wait(rozpracovane, return_when=FIRST_COMPLETED)
+                    for future in hotove_futures:
+                        fronta.put(future.result())
+                rozpracovane.add(pool.submit(zpracuj_soubor, pdf_path, rezim))
+
+            for future in rozpracovane:
+                fronta.put(future.result())
+    finally:
+        fronta.put(KONEC)
+        vlakno.join()
+        for sig, obsluha in puvodni_obsluhy.items():
+            signal.signal(sig, obsluha)
+
+    elapsed = time.perf_counter() - start
+    print("\n" + "="*50)
+    print(f"Zpracováno souborů: {statistiky['zpracovano']}, uloženo řádků: {statistiky['ulozeno']}, chyb: {len(statistiky['chyby'])}")
+    if elapsed > 0:
+        print(f"Celkový čas: {elapsed:.1f} s, propustnost: {statistiky['zpracovano'] / elapsed:.2f} souborů/s")
+    if zastavit.is_set():
+        print("Zpracování bylo přerušeno, při dalším spuštění se pokračuje od uloženého postupu.")
+    return statistiky
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Proudové zpracování složky PDF závěrek do tabulky accounting_data")
+    parser.add_argument('--adresar', default=UZAVERKY_DIR)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--rezim', choices=REZIMY, default=REZIM_TEXT)
+    parser.add_argument('--postup', default=SOUBOR_POSTUPU, help="Soubor se seznamem zpracovaných PDF")
+    parser.add_argument('--chyby', default=SOUBOR_CHYB, help="Soubor s neúspěšnými pokusy")
+    parser.add_argument('--max-pokusu', type=int, default=MAX_POKUSU)
+    parser.add_argument('--znovu', action='store_true', help="Smazat postup i chyby a zpracovat vše znovu")
+    args = parser.parse_args()
+
+    if args.znovu:
+        for soubor in (args.postup, args.chyby):
+            if os.path.exists(soubor):
+                os.remove(soubor)
+    spust_pipeline(args.adresar, args.workers, args.batch_size, args.rezim, args.postup,
+                   soubor_chyb=args.chyby, max_pokusu=args.max_pokusu)
\ No newline at end of file
@@ -0,0 +1,179 @@
+import re
+from bisect import bisect_left
+from collections import namedtuple
+
+RadekVykazu = namedtuple('RadekVykazu', ['kod', 'nazev', 'cisla'])
+
+# Kód řádku: A., A.1, D.2.1., III.3., B.I., C.II.1., B.+C., *, **, ***
+KOD = r'\*{1,3}|[A-Z]{1,4}\.(?:(?:[IVX]+|\d+)\.?)*(?:\+[A-Z]{1,4}\.?)*'
+KOD_RE = re.compile(KOD)
+
+# Řádek výkazu: kód na začátku, popis a souvislý blok čísel na konci řádku
+# - vše v jednom průchodu regexu
+RADEK_RE = re.compile(
+    r'^\s*(?:(?P<kod>' + KOD + r')(?=\s|$))?'
+    r'\s*(?P<nazev>.*?)'
+    r'\s*(?P<cisla>(?<!\S)-?\d+(?:\s+-?\d+)*)?\s*$'
+)
+
+# Tisícová skupina ("1 234 567" -> "1", "234", "567")
+SKUPINA_RE = re.compile(r'\d{3}')
+ZACATEK_SKUPINY_RE = re.compile(r'-?[1-9]\d{0,2}')
+CISLO_RE = re.compile(r'-?\d+')
+
+# Nadpis sekce výkazu - každá sekce má vlastní hlavičku sloupců
+# ("AKTIVA CELKEM" je už řádek s hodnotami)
+NADPIS_SEKCE_RE = re.compile(r'^(?:AKTIVA|PASIVA)$|Výkaz zisku')
+
+# Slova, jejichž horní hrana se liší nejvýš o tolik bodů, leží na stejném řádku
+TOLERANCE_RADKU = 3
+# Mezera mezi skupinami tisíců je menší než tato část výšky písma
+MEZERA_TISICU = 0.5
+
+def normalizuj_kod(kod):
+    """Sjednotí zápis kódu řádku ("A.1" i "A.1." -> "A.1", "* " -> "*")"""
+    return kod.strip().rstrip('.')
+
+def rozloz_radek(radek, pocet=None):
+    """Rozloží řádek výkazu na kód, popis a n-tici čísel
+
+    Args:
+        radek (str): Řádek textu z PDF
+        pocet (int): Očekávaný počet číselných sloupců, podle něj se rozhoduje
+                     nejednoznačné seskupení tisíců
+    Returns:
+        RadekVykazu: kód (nebo None), popis a n-tice čísel (může být prázdná)
+    """
+    if isinstance(radek, RadekVykazu):
+        # Řádek z režimu tabulky už je rozložený podle souřadnic
+        return radek
+    match = RADEK_RE.match(radek)
+    cisla = match.group('cisla')
+    tokeny = cisla.split() if cisla else []
+    return RadekVykazu(
+        match.group('kod'),
+        match.group('nazev'),
+        tuple(int(''.join(skupina)) for skupina in seskup_cisla(tokeny, pocet)),
+    )
+
+def seskup_cisla(tokeny, pocet=None):
+    """Spojí tokeny rozdělené oddělovačem tisíců ("1", "234" -> "1 234")
+
+    Token o přesně třech číslicích se připojí k předchozímu číslu. Pokud tím
+    vznikne jiný počet sloupců než očekávaný, hledá se rozdělení na přesně
+    `pocet` čísel (přednost mají delší čísla vlevo). Když žádné neexistuje,
+    vrátí se hladové seskupení a volající pozná chybějící sloupec podle délky.
+    """
+    skupiny = []
+    for token in tokeny:
+        if skupiny and SKUPINA_RE.fullmatch(token) and ZACATEK_SKUPINY_RE.fullmatch(skupiny[-1][0]):
+            skupiny[-1].append(token)
+        else:
+            skupiny.append([token])
+
+    if pocet is None or len(skupiny) == pocet:
+        return skupiny
+    rozdeleni = _rozdel(tokeny, pocet)
+    return rozdeleni if rozdeleni is not None else skupiny
+
+def _rozdel(tokeny, pocet):
+    if pocet == 0:
+        return [] if not tokeny else None
+    for delka in range(len(tokeny) - pocet + 1, 0, -1):
+        skupina = tokeny[:delka]
+        if delka > 1 and not (ZACATEK_SKUPINY_RE.fullmatch(skupina[0])
+                              and all(SKUPINA_RE.fullmatch(token) for token in skupina[1:])):
+            continue
+        zbytek = _rozdel(tokeny[delka:], pocet - 1)
+        if zbytek is not None:
+            return [skupina] + zbytek
+    return None
+
+def text_radku(radek):
+    """Složí z rozloženého řádku text (pro hledání IČO, data a začátků sekcí)"""
+    casti = [radek.kod, radek.nazev] + [str(cislo) for cislo in radek.cisla if cislo is not None]
+    return " ".join(cast for cast in casti if cast)
+
+def radky_ze_slov(slova, sloupce=None):
+    """Sestaví řádky výkazu ze slov stránky se souřadnicemi (pdfplumber extract_words)
+
+    Sloupce se určí z řádku s čísly sloupců ("1 2 3 4", "1 2", "5 6") pod hlavičkou
+    tabulky a na nadpisu další sekce se zapomenou. Čísla jsou zarovnaná vpravo,
+    takže pravý okraj hodnoty leží mezi středem čísla svého sloupce a středem
+    dalšího - prázdná buňka tak nikdy neposune ostatní hodnoty. Dokud hlavička
+    sloupců není známá, řádek se rozloží z textu (rozloz_radek).
+
+    Args:
+        slova (list): Slova stránky (slovníky s klíči text, x0, x1, top, bottom)
+        sloupce (list): Středy sloupců z předchozí stránky, pokud tabulka pokračuje
+    Returns:
+        tuple: (seznam RadekVykazu, středy sloupců pro další stránku);
+               cisla mají délku podle počtu sloupců, prázdná buňka je None
+    """
+    radky = []
+    for slova_radku in _seskup_do_radku(slova):
+        texty = [slovo['text'] for slovo in slova_radku]
+        if _je_hlavicka_sloupcu(texty):
+            sloupce = [(slovo['x0'] + slovo['x1']) / 2 for slovo in slova_radku]
+            continue
+        if NADPIS_SEKCE_RE.search(" ".join(texty)):
+            sloupce = None
+        radky.append(_radek_ze_slov(slova_radku, sloupce))
+    return radky, sloupce
+
+def _je_hlavicka_sloupcu(texty):
+    # Po sobě jdoucí čísla sloupců od libovolného začátku ("1 2 3 4", "5 6")
+    if len(texty) < 2 or not all(text.isdigit() for text in texty):
+        return False
+    prvni = int(texty[0])
+    return prvni >= 1 and texty == [str(prvni + i) for i in range(len(texty))]
+
+def _seskup_do_radku(slova):
+    radky = []
+    for slovo in sorted(slova, key=lambda slovo: (slovo['top'], slovo['x0'])):
+        if radky and slovo['top'] - radky[-1][0]['top'] <= TOLERANCE_RADKU:
+            radky[-1].append(slovo)
+        else:
+            radky.append([slovo])
+    return [sorted(radek, key=lambda slovo: slovo['x0']) for radek in radky]
+
+def _radek_ze_slov(slova, sloupce):
+    if not sloupce:
+        return rozloz_radek(" ".join(slovo['text'] for slovo in slova))
+    # Slova popisu jsou řetězce, čísla [tokeny, pravý okraj] - tisícové skupiny se spojí
+    # dřív, než se podle pravého okraje rozhodne, zda číslo patří do sloupce nebo do popisu
+    # (první skupina vpravo zarovnaného čísla může ležet vlevo od středu sloupce)
+    casti = []
+    for slovo in slova:
+        text = slovo['text']
+        if not CISLO_RE.fullmatch(text):
+            casti.append(text)
+            continue
+        predchozi = casti[-1] if casti and isinstance(casti[-1], list) else None
+        if (predchozi is not None
+                and slovo['x0'] - predchozi[1] < MEZERA_TISICU * (slovo['bottom'] - slovo['top'])
+                and SKUPINA_RE.fullmatch(text)
+                and ZACATEK_SKUPINY_RE.fullmatch(predchozi[0][0])):
+            predchozi[0].append(text)
+            predchozi[1] = slovo['x1']
+        else:
+            casti.append([[text], slovo['x1']])
+
+    popis = []
+    bunky = []
+    for cast in casti:
+        if isinstance(cast, str):
+            popis.append(cast)
+        elif cast[1] <= sloupce[0]:
+            popis.extend(cast[0])
+        else:
+            bunky.append(cast)
+
+    cisla = [None] * len(sloupce)
+    for tokeny, x1 in bunky:
+        cisla[bisect_left(sloupce, x1) - 1] = int(''.join(tokeny))
+
+    kod = None
+    if popis and KOD_RE.fullmatch(popis[0]):
+        kod = popis.pop(0)
+    return RadekVykazu(kod, " ".join(popis), tuple(cisla) if bunky else ())
\ No newline at end of file
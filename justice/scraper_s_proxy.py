@@ -4,6 +4,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+import glob
 import time
 import os
 import re
@@ -17,20 +18,74 @@ import shutil
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from db import AresData, DatabaseConnection  # Import třídy AresData a DatabaseConnection z db.py
+from db import AresData, CrawlStatus, DatabaseConnection  # Import modelů a DatabaseConnection z db.py
+import crawl_status
+import crawl_priority
+from sqlalchemy import and_, exists, select
 from sqlalchemy.orm import Session
 
-def load_icos_from_db():
-    """Načte seznam IČO z tabulky AresData v databázi."""
-    try:
-        db = DatabaseConnection()  # Singleton instance z db.py
-        session = db.get_session()  # Získáme existující session
-        icos = [record.ico for record in session.query(AresData).all()]
-        # Session nezavíráme, respektujeme váš singleton design
-        return icos
-    except Exception as e:
-        print(f"Chyba při načítání IČO z databáze: {e}")
-        return []
+# Počet IČO načítaných z databáze jedním dotazem
+LOAD_BATCH_SIZE = 5000
+
+def load_icos_from_db(source=crawl_status.SOURCE_JUSTICE, batch_size=LOAD_BATCH_SIZE):
+    """Postupně vrací IČO z AresData, která ještě nemají stav ve frontě crawl_status.
+
+    Načítá se jen sloupec ico po stránkách podle primárního klíče, zpracovaná
+    a stažená IČO vyřadí anti-join už v databázi - paměť nezávisí na velikosti
+    registru. Mezi stránkami není otevřený kurzor, takže volající může do
+    crawl_status průběžně zapisovat.
+    """
+    last_ico = None
+    while True:
+        query = select(AresData.ico).where(
+            ~exists().where(and_(CrawlStatus.ico == AresData.ico, CrawlStatus.source == source))
+        )
+        if last_ico is not None:
+            query = query.where(AresData.ico > last_ico)
+        try:
+            with DatabaseConnection.session_scope() as session:
+                icos = session.scalars(query.order_by(AresData.ico).limit(batch_size)).all()
+        except Exception as e:
+            print(f"Chyba při načítání IČO z databáze: {e}")
+            return
+        yield from icos
+        if len(icos) < batch_size:
+            return
+        last_ico = icos[-1]
+
+def enqueue_new_icos(processed_icos, existing_icos, batch_size=LOAD_BATCH_SIZE):
+    """Přidá do fronty IČO, která v ní ještě nejsou; lokálně zpracovaná rovnou s výsledkem
+
+    IČO se staženým souborem (existing_icos: ico -> datum podání) jsou hotová, IČO jen
+    z deníku jsou bez dokumentu. Obojí má naplánovanou další kontrolu, takže se po čase
+    vrátí do fronty. V ustáleném stavu anti-join nevrátí skoro nic, takže start je
+    okamžitý. Vrací počet přidaných IČO.
+    """
+    source = crawl_status.SOURCE_JUSTICE
+    pending, done, no_document = [], [], []
+    added = 0
+
+    def flush():
+        count = crawl_status.mark_many(source, pending, crawl_status.STATUS_PENDING)
+        count += crawl_status.mark_many(source, done, crawl_status.STATUS_DONE,
+                                        filed_at={ico: existing_icos[ico] for ico in done})
+        count += crawl_status.mark_many(source, no_document, crawl_status.STATUS_NO_DOCUMENT)
+        pending.clear()
+        done.clear()
+        no_document.clear()
+        return count
+
+    for ico in load_icos_from_db(source, batch_size):
+        if ico in existing_icos:
+            done.append(ico)
+        elif ico in processed_icos:
+            no_document.append(ico)
+        else:
+            pending.append(ico)
+        if len(pending) + len(done) + len(no_document) >= batch_size:
+            added += flush()
+    added += flush()
+    return added
 
 # Třída ProxyRotator pro rotaci proxy
 class ProxyRotator:
@@ -302,14 +357,17 @@ def randomize_browser_fingerprint(driver):
     print(f"Nastavena randomizace prohlížeče: {chosen_platform}, {hw_concurrency} jádra, rozlišení {screen_width}x{screen_height}")
 
 def get_existing_icos(download_dir):
-    """Načte seznam IČO z názvů souborů ve složce."""
-    existing_icos = set()
+    """Načte IČO z názvů souborů ve složce s datem posledního podání (ico -> datum nebo None)."""
+    existing_icos = {}
     for filename in os.listdir(download_dir):
         if filename.endswith('.pdf'):
             # Předpokládáme formát názvu: ICO_datum.pdf (např. 18240054_16_03_2025.pdf)
             ico = filename.split('_')[0]  # Vezmeme první část před podtržítkem
             if ico.isdigit() and len(ico) == 8:  # Kontrola, že to vypadá jako IČO
-                existing_icos.add(ico)
+                filed_at = filing_date_from_path(filename)
+                previous = existing_icos.get(ico)
+                if ico not in existing_icos or (filed_at and (previous is None or filed_at > previous)):
+                    existing_icos[ico] = filed_at
     return existing_icos
 
 def rotate_user_agent():
@@ -513,26 +571,113 @@ def verify_ip_change(old_ip=None):
         print(f"Chyba při ověřování IP: {e}")
         return None
 
-def load_processed_icos(download_dir):
-    """Načte seznam zpracovaných IČO z JSON souboru."""
-    processed_file = os.path.join(download_dir, "processed_icos.json")
-    if os.path.exists(processed_file):
+# Starý lokální stav scraperu - deník zpracovaných IČO (jedno IČO na řádek) a před ním JSON.
+# Stav je teď v tabulce crawl_status, deník se jen jednou převede do prázdné fronty.
+PROCESSED_JOURNAL = "processed_icos.log"
+LEGACY_PROCESSED_FILE = "processed_icos.json"
+
+class ProcessedIcoJournal:
+    def __init__(self, download_dir):
+        """
+        Deník zpracovaných IČO z doby před frontou crawl_status - už se jen čte.
+        Args:
+            download_dir (str): Složka, ve které je deník uložen
+        """
+        self.path = os.path.join(download_dir, PROCESSED_JOURNAL)
+        self.legacy_path = os.path.join(download_dir, LEGACY_PROCESSED_FILE)
+
+    def load(self):
+        """Přehraje deník do množiny; při duplicitách, useknutém řádku nebo starém JSON ho zkompaktuje"""
+        icos = set()
+        lines = 0
+        needs_compaction = False
+
+        if os.path.exists(self.legacy_path):
+            try:
+                with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                    icos.update(json.load(f))
+                needs_compaction = True
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"Chyba při načítání zpracovaných IČO ze starého souboru: {e}")
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if not line.endswith('\n'):
+                            # Poslední řádek useknutý pádem - IČO se zpracuje znovu
+                            needs_compaction = True
+                            break
+                        icos.add(line.rstrip('\n'))
+                        lines += 1
+            except IOError as e:
+                print(f"Chyba při načítání deníku zpracovaných IČO: {e}")
+
+        if needs_compaction or lines > len(icos):
+            self.compact(icos)
+        return icos
+
+    def compact(self, icos):
+        """Přepíše deník jen unikátními IČO (přes dočasný soubor, takže atomicky)"""
+        temp_path = f"{self.path}.tmp"
         try:
-            with open(processed_file, 'r', encoding='utf-8') as f:
-                return set(json.load(f))
-        except (json.JSONDecodeError, IOError) as e:
-            print(f"Chyba při načítání zpracovaných IČO: {e}")
-    return set()
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for ico in sorted(icos):
+                    f.write(ico + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            # Obsah starého JSON je teď v deníku
+            if os.path.exists(self.legacy_path):
+                os.replace(self.legacy_path, self.legacy_path + ".bak")
+        except IOError as e:
+            print(f"Chyba při kompaktování deníku zpracovaných IČO: {e}")
+
+def load_processed_icos(download_dir):
+    """Načte množinu zpracovaných IČO z deníku (a jednorázově převede starý processed_icos.json)."""
+    return ProcessedIcoJournal(download_dir).load()
 
 def save_processed_ico(download_dir, ico, processed_icos):
-    """Uloží nové IČO do seznamu zpracovaných."""
+    """Označí IČO jako zpracované v tomto běhu (výsledek se zapisuje do crawl_status)."""
     processed_icos.add(ico)
-    processed_file = os.path.join(download_dir, "processed_icos.json")
+
+# Počet IČO převzatých z fronty najednou - při pádu se uvolní po LEASE_TIMEOUT
+CLAIM_BATCH_SIZE = 10
+
+def find_downloaded_file(download_dir, ico):
+    """Vrátí cestu k naposledy staženému PDF daného IČO (nebo None)"""
+    files = glob.glob(os.path.join(download_dir, f"{ico}_*.pdf"))
+    return max(files, key=os.path.getmtime) if files else None
+
+def filing_date_from_path(path):
+    """Datum podání z názvu staženého souboru (ICO_den_měsíc_rok.pdf)"""
+    match = re.search(r'_(\d{1,2})_(\d{1,2})_(\d{4})\.pdf$', path or '')
+    if not match:
+        return None
+    den, mesic, rok = (int(part) for part in match.groups())
     try:
-        with open(processed_file, 'w', encoding='utf-8') as f:
-            json.dump(list(processed_icos), f, ensure_ascii=False, indent=2)
-    except IOError as e:
-        print(f"Chyba při ukládání zpracovaných IČO: {e}")
+        return datetime(rok, mesic, den).date()
+    except ValueError:
+        return None
+
+def record_crawl_result(download_dir, ico, result, processed_icos):
+    """Zapíše výsledek process_ico do sdílené tabulky crawl_status"""
+    source = crawl_status.SOURCE_JUSTICE
+    try:
+        if result is None:
+            # Problém s proxy nebo CAPTCHA - IČO se vrátí do fronty
+            crawl_status.release(ico, source)
+        elif result:
+            path = find_downloaded_file(download_dir, ico)
+            checksum = crawl_status.file_checksum(path) if path else None
+            crawl_status.mark_result(ico, source, crawl_status.STATUS_DONE, path, checksum,
+                                     filing_date_from_path(path))
+        elif ico in processed_icos:
+            crawl_status.mark_result(ico, source, crawl_status.STATUS_NO_DOCUMENT)
+        else:
+            crawl_status.mark_result(ico, source, crawl_status.STATUS_FAILED)
+    except Exception as e:
+        print(f"Chyba při ukládání stavu IČO {ico}: {e}")
 
 def timeout_handler(signum, frame):
     """Obsluha timeoutu pro operace, které by mohly zablokovat"""
@@ -1003,14 +1148,6 @@ def main():
     # Vytvoření složky, pokud neexistuje
     os.makedirs(download_dir, exist_ok=True)
 
-    # Načtení existujících IČO ze složky (pro informaci)
-    existing_icos = get_existing_icos(download_dir)
-    print(f"Nalezeno {len(existing_icos)} již stažených IČO: {existing_icos}")
-
-    # Načtení zpracovaných IČO (včetně těch bez závěrky)
-    processed_icos = load_processed_icos(download_dir)
-    print(f"Nalezeno {len(processed_icos)} zpracovaných IČO: {processed_icos}")
-
     # Inicializace limiteru
     limiter_file = os.path.join(download_dir, "request_limiter.json")
     limiter = RequestLimiter(limiter_file, daily_limit=2950)
@@ -1023,24 +1160,51 @@ def main():
     print(limiter.get_status_report())
     print(f"Zbývající počet požadavků: {limiter.get_remaining_requests()}")
 
-    # Načtení seznamu IČO z databáze
-    ico_list = load_icos_from_db()
-    if not ico_list:
-        print("Nepodařilo se načíst IČO z databáze, ukončuji...")
+    # Fronta IČO je sdílená v databázi, pracovníci na více strojích si berou různé dávky
+    # Zpracovaná IČO z tohoto běhu (a při prvním převodu i ze starého deníku)
+    processed_icos = set()
+    try:
+        existing_icos = {}
+        if not crawl_status.has_entries(crawl_status.SOURCE_JUSTICE):
+            # Lokální stav z dřívějších běhů (stažené soubory a deník) se do prázdné
+            # fronty převede jen jednou, další starty složku ani deník nečtou
+            existing_icos = get_existing_icos(download_dir)
+            processed_icos = load_processed_icos(download_dir)
+            print(f"Převádím do fronty lokální stav: {len(existing_icos)} stažených a {len(processed_icos)} zpracovaných IČO")
+        new_count = enqueue_new_icos(processed_icos, existing_icos)
+        print(f"Do fronty přidáno {new_count} nových IČO")
+        # Hotová IČO se vrátí do fronty, jen když už mohla podat závěrku za další rok
+        synced = crawl_status.sync_latest_periods(crawl_status.SOURCE_JUSTICE)
+        requeued = crawl_status.requeue_due(crawl_status.SOURCE_JUSTICE)
+        print(f"Aktualizováno období u {synced} IČO, k obnovení závěrky vráceno {requeued} IČO")
+        # Denní limit požadavků se utratí nejdřív za firmy, u kterých je závěrka nejcennější
+        skipped, prioritized = crawl_priority.prioritize(crawl_status.SOURCE_JUSTICE)
+        print(f"Přeskočeno {skipped} IČO bez závěrek, spočítána priorita {prioritized} nových IČO")
+    except Exception as e:
+        print(f"Nepodařilo se připravit frontu IČO v databázi, ukončuji... ({e})")
         return
     
-    print(f"Celkem načteno {len(ico_list)} IČO ke zpracování z databáze")
-    
-    # Zpracování seznamu IČO
+    # Zpracování IČO z fronty
     driver = None
     current_proxy = None
     processed_count = 0
+    claimed = []
     
     try:
-        for ico in ico_list:
-            if ico in processed_icos:
-                print(f"IČO {ico} již bylo zpracováno, přeskakuji...")
-                continue
+        while True:
+            if not limiter.can_make_request():
+                print(f"Dosažen denní limit požadavků ({limiter.daily_limit}).")
+                break
+            if not claimed:
+                claimed = crawl_status.claim_batch(crawl_status.SOURCE_JUSTICE, CLAIM_BATCH_SIZE)
+                if not claimed:
+                    print("Fronta IČO je prázdná, vše je zpracováno.")
+                    break
+            # Lokálně zpracovaná IČO převedl do fronty už enqueue_new_icos, z fronty
+            # tak přichází jen nová IČO a IČO k obnovení závěrky
+            ico = claimed[0]
+            # U obnovovaného IČO rozhoduje o výsledku až tento pokus (viz record_crawl_result)
+            processed_icos.discard(ico)
 
             if proxy_rotator and (driver is None or processed_count % 10 == 0):
                 if driver is not None:
@@ -1075,8 +1239,10 @@ def main():
                     print("Nepodařilo se získat proxy. Ukončuji skript.")
                     sys.exit(1)
                 
-                process_ico(ico, driver, limiter, download_dir, proxy_rotator, current_proxy, processed_icos)
+                result = process_ico(ico, driver, limiter, download_dir, proxy_rotator, current_proxy, processed_icos)
             
+            record_crawl_result(download_dir, ico, result, processed_icos)
+            claimed.pop(0)
             processed_count += 1
             
     except KeyboardInterrupt:
@@ -1102,6 +1268,13 @@ def main():
         if driver is not None:
             print("Zavírám prohlížeč...")
             driver.quit()
+
+        # Nezpracovaná převzatá IČO se vrátí do fronty pro ostatní pracovníky
+        for ico in claimed:
+            try:
+                crawl_status.release(ico, crawl_status.SOURCE_JUSTICE)
+            except Exception as e:
+                print(f"Nepodařilo se uvolnit IČO {ico}: {e}")
         
         print("Skript dokončen.")
 
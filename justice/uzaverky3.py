@@ -1,14 +1,24 @@
+import argparse
 import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from datetime import datetime
 import pdfplumber
 import os
 import sys
 import traceback
 
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from db import DatabaseConnection, AccountingData
+from dates import parse_date
+from db import DatabaseConnection, AccountingData, nazev_sloupce_hodnoty
+import cache_textu
+from radky_vykazu import RadekVykazu, normalizuj_kod, radky_ze_slov, rozloz_radek, text_radku
 
 # Expanded mapping for more detailed financial statement extraction
 mapa_aktiv = {
@@ -147,13 +157,136 @@ mapa_vzz = {
     #"* ": "čistý_obrat_za_účetní_období",
 }
 
-def extract_text_from_pdf(pdf_filename):
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    pdf_path = os.path.join(script_dir, "uzaverky", pdf_filename)
-    
+# Názvy z map, které se liší od názvu sloupce v accounting_data
+ALIASY_SLOUPCU = {
+    "software": "souftware",
+    "výsledek_hospodaření_z_minulých_let": "výsledek_hospodaření_minulých_let",
+    "výnosové_úroky_a_podobné_výnosy_ovládaná_nebo_ovládající_osoba": "výnosové_úroky_a_podobné_výnosy_ovládané_nebo_ovládající_osoba",
+    "výnosy_z_ostatního_dlouhodobého_finančního_majetku_ovládaná_nebo_ovládající_osoba": "výnosy_z_ostaního_dlouhodobého_finančního_majetku_nebo_ovládající_osoba",
+}
+
+def sestav_sloupce_mapy(mapa, hlavni, dalsi):
+    """Převede mapu {kód: název} na n-tici (název v datech sekce, ((klíč hodnoty, sloupec), ...))
+
+    Hlavní hodnota jde do sloupce s názvem položky, další hodnoty do sloupců
+    s příponou (nazev_sloupce_hodnoty). Volá se jednou při importu - název, který
+    neodpovídá žádnému sloupci AccountingData, skončí chybou hned a ne tichou
+    ztrátou dat.
+    """
+    sloupce = AccountingData.__table__.columns
+    vysledek = []
+    for nazev in mapa.values():
+        sloupec = ALIASY_SLOUPCU.get(nazev, nazev)
+        hodnoty = [(hlavni, sloupec)] + [(klic, nazev_sloupce_hodnoty(sloupec, klic)) for klic in dalsi]
+        for _, nazev_sloupce in hodnoty:
+            if nazev_sloupce not in sloupce:
+                raise KeyError(f"Položka mapy '{nazev}' nemá sloupec {nazev_sloupce} v tabulce {AccountingData.__tablename__}")
+        vysledek.append((nazev, tuple(hodnoty)))
+    return tuple(vysledek)
+
+# Aktiva mají sloupce brutto/korekce/netto/netto_minulé - hlavní sloupec drží netto běžného období
+SLOUPCE_AKTIV = sestav_sloupce_mapy(mapa_aktiv, "netto", ("brutto", "korekce", "netto_minulé"))
+SLOUPCE_PASIV = sestav_sloupce_mapy(mapa_pasiv, "běžné", ("minulé",))
+SLOUPCE_VZZ = sestav_sloupce_mapy(mapa_vzz, "běžné", ("minulé",))
+
+# Všechny sloupce kromě id, aby měly řádky pro hromadný INSERT stejné klíče
+PRAZDNY_RADEK = {column.name: None for column in AccountingData.__table__.columns if column.name != 'id'}
+
+def sestav_radek(ico, datum, data_aktiv, data_pasiv, data_vzz):
+    """Sestaví z dat sekcí slovník hodnot sloupců accounting_data"""
+    row = dict(PRAZDNY_RADEK, ico=ico, běžné_účetní_období=datum)
+    for data, sloupce in ((data_aktiv, SLOUPCE_AKTIV), (data_pasiv, SLOUPCE_PASIV), (data_vzz, SLOUPCE_VZZ)):
+        for nazev, hodnoty in sloupce:
+            polozka = data.get(nazev)
+            if polozka is not None:
+                for klic, sloupec in hodnoty:
+                    row[sloupec] = polozka.get(klic)
+    return row
+
+# Výchozí složka se staženými závěrkami
+UZAVERKY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "uzaverky")
+
+# Poslední řádek výkazu zisku a ztráty - stránky za ním (příloha apod.) se nepoužívají
+KONEC_VZZ = "čistý obrat za účetní období"
+
+# Verze extrakce textu - při změně extrahuj_stranky zvýšit, cache se pak vytvoří znovu
+VERZE_EXTRAKCE = 1
+VERZE_TABULKY = 2
+
+# Režimy extrakce: "text" čte řádky z extract_text() a sloupce odhaduje podle počtu
+# čísel, "tabulka" skládá řádky ze souřadnic slov a sloupce bere z hlavičky
+REZIM_TEXT = "text"
+REZIM_TABULKA = "tabulka"
+REZIMY = (REZIM_TEXT, REZIM_TABULKA)
+
+def extract_text_from_pdf(pdf_filename, pouzit_cache=True):
+    # Relativní název se hledá ve složce uzaverky, absolutní cesta se použije přímo
+    pdf_path = os.path.join(UZAVERKY_DIR, pdf_filename)
+    if not pouzit_cache:
+        return "\n".join(extrahuj_stranky(pdf_path))
+
+    # Text se nemění ani při úpravě map, takže se pdfplumber spouští jen poprvé
+    digest = cache_textu.hash_souboru(pdf_path)
+    stranky = cache_textu.nacti_stranky(digest, VERZE_EXTRAKCE)
+    if stranky is None:
+        stranky = extrahuj_stranky(pdf_path)
+        cache_textu.uloz_stranky(digest, VERZE_EXTRAKCE, stranky)
+    return "\n".join(stranky)
+
+def extrahuj_stranky(pdf_path):
+    """Vrátí text stránek PDF až po konec výkazu zisku a ztráty
+
+    Text každé stránky se počítá jen jednou a stránka se hned zavře,
+    aby se uvolnily objekty z analýzy rozložení.
+    """
+    stranky = []
+    vzz_nalezen = False
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text()
+            page.close()
+            if not text:
+                continue
+            stranky.append(text)
+            vzz_nalezen = vzz_nalezen or "Výkaz zisku" in text
+            if vzz_nalezen and KONEC_VZZ in text.lower():
+                break
+    return stranky
+
+def extrahuj_radky_z_pdf(pdf_filename, pouzit_cache=True):
+    """Vrátí řádky výkazů (RadekVykazu) složené ze souřadnic slov"""
+    pdf_path = os.path.join(UZAVERKY_DIR, pdf_filename)
+    if not pouzit_cache:
+        return extrahuj_tabulky(pdf_path)
+
+    digest = cache_textu.hash_souboru(pdf_path)
+    verze = f"tabulka{VERZE_TABULKY}"
+    radky = cache_textu.nacti_stranky(digest, verze)
+    if radky is None:
+        radky = extrahuj_tabulky(pdf_path)
+        cache_textu.uloz_stranky(digest, verze, radky)
+    return [RadekVykazu(kod, nazev, tuple(cisla)) for kod, nazev, cisla in radky]
+
+def extrahuj_tabulky(pdf_path):
+    """Jeden průchod extract_words na stránku, řádky se skládají podle souřadnic
+
+    Sloupce z hlavičky se přenášejí na další stránku, protože tabulka může
+    pokračovat bez nové hlavičky.
+    """
+    radky = []
+    sloupce = None
+    vzz_nalezen = False
     with pdfplumber.open(pdf_path) as pdf:
-        text_data = [page.extract_text() for page in pdf.pages if page.extract_text()]
-        return "\n".join(text_data)
+        for page in pdf.pages:
+            slova = page.extract_words()
+            page.close()
+            radky_stranky, sloupce = radky_ze_slov(slova, sloupce)
+            radky.extend(radky_stranky)
+            text = "\n".join(text_radku(radek) for radek in radky_stranky)
+            vzz_nalezen = vzz_nalezen or "Výkaz zisku" in text
+            if vzz_nalezen and KONEC_VZZ in text.lower():
+                break
+    return radky
 
 def extrahuj_ico(text):
     for line in text.split('\n'):
@@ -179,83 +312,83 @@ def detekuj_typ_rozvahy(text):
         return "plná"
     return "zkrácená"
 
-def extrahuj_data_řádku(radek, pocet_cisel):
-    slova = radek.split()
-    # Modified to preserve negative signs
-    cisla = []
-    for s in slova:
-        try:
-            # Convert string to integer while preserving negative signs
-            cislo = int(s.replace(" ", ""))
-            cisla.append(cislo)
-        except ValueError:
-            continue
-            
-    if len(cisla) < pocet_cisel:
-        return None
-        
-    index_prvniho_cisla = next((i for i, s in enumerate(slova) if s.replace(" ", "").replace("-", "").isdigit()), -1)
-    if index_prvniho_cisla == -1:
-        return None
-        
-    kod_a_nazev = ' '.join(slova[:index_prvniho_cisla])
-    match = re.match(r'([A-Z]+\.[IVX]*\.?|\*{1,3})', kod_a_nazev)
-    if match:
-        kod = match.group(1)
-        return kod, cisla
-    return None
-
 def zpracuj_sekci(lines, mapa, pocet_cisel):
     data = {}
+    mapa = {normalizuj_kod(kod): nazev for kod, nazev in mapa.items()}
     for radek in lines:
-        if not radek.strip():
+        kod, popis, cisla = rozloz_radek(radek, pocet_cisel)
+        if kod is None and not popis and not cisla:
             continue
-        if "CELKEM" in radek:
-            # Modified to preserve negative signs
-            cisla = []
-            for s in radek.split():
-                try:
-                    # Preserve negative signs when converting to int
-                    cislo = int(s.replace(" ", ""))
-                    cisla.append(cislo)
-                except ValueError:
-                    continue
-            cisla = [c for c in cisla if c is not None]
-            if pocet_cisel == 4:
+        if "CELKEM" in popis:
+            if pocet_cisel == 4 and len(cisla) >= 4:
                 data["aktiva_celkem"] = {"brutto": cisla[0], "korekce": cisla[1], "netto": cisla[2], "netto_minulé": cisla[3]}
-            elif pocet_cisel == 2:
+            elif pocet_cisel == 2 and len(cisla) >= 2:
                 data["pasiva_celkem"] = {"běžné": cisla[0], "minulé": cisla[1]}
      
-        else:
-            extrahovane = extrahuj_data_řádku(radek, pocet_cisel)
-            if extrahovane:
-                kod, cisla = extrahovane
-                if kod in mapa:
-                    if pocet_cisel == 4:
-                        data[mapa[kod]] = {"brutto": cisla[0], "korekce": cisla[1], "netto": cisla[2], "netto_minulé": cisla[3]}
-                    elif pocet_cisel == 2:
-                        data[mapa[kod]] = {"běžné": cisla[0], "minulé": cisla[1]}
+        elif kod is not None and len(cisla) >= pocet_cisel:
+            kod = normalizuj_kod(kod)
+            if kod in mapa:
+                if pocet_cisel == 4:
+                    data[mapa[kod]] = {"brutto": cisla[0], "korekce": cisla[1], "netto": cisla[2], "netto_minulé": cisla[3]}
+                elif pocet_cisel == 2:
+                    data[mapa[kod]] = {"běžné": cisla[0], "minulé": cisla[1]}
             
-        if "obrat" in radek.lower():
+        if "obrat" in popis.lower():
                 print(radek)
-                cisla = []
-                for s in radek.split():
-                    try:
-                        # Convert string to integer while preserving negative signs
-                        cislo = int(s.replace(" ", ""))
-                        cisla.append(cislo)
-                    except ValueError:
-                        continue
+                cisla = rozloz_radek(radek, 2).cisla
                 if len(cisla) >= 2:
                     data["obrat"] = {"běžné": cisla[0], "minulé": cisla[1]}
             
     return data
 
-def zpracuj_uzaverku(pdf_filename):
-    text = extract_text_from_pdf(pdf_filename)
+def sestav_mapu_kodu(mapa):
+    """Převede mapu {kód: sloupec} na {normalizovaný kód: [sloupce v pořadí výskytu]}
+
+    Řádky s hvězdičkami se ve výkazu opakují ("*" provozní a pak finanční výsledek,
+    "**" před a po zdanění), n-tý výskyt kódu se proto přiřadí n-tému sloupci.
+    """
+    kody = {}
+    for kod, nazev in mapa.items():
+        kody.setdefault(normalizuj_kod(kod), []).append(nazev)
+    return kody
+
+KODY_VZZ = sestav_mapu_kodu(mapa_vzz)
+
+def zpracuj_vzz(lines, kody=KODY_VZZ):
+    """Jednoprůchodové zpracování výkazu zisku a ztráty
+
+    Každý řádek se rozloží jednou, kód řádku se najde ukotveným regexem
+    a sloupec se dohledá ve slovníku. Hodnoty jsou první dvě čísla na řádku.
+    """
+    data = {}
+    vyskyty = {}
+    for radek in lines:
+        kod, _, cisla = rozloz_radek(radek, 2)
+        if kod is None:
+            continue
+        kod = normalizuj_kod(kod)
+        nazvy = kody.get(kod)
+        if nazvy is None:
+            continue
+        poradi = vyskyty.get(kod, 0)
+        vyskyty[kod] = poradi + 1
+        if poradi >= len(nazvy):
+            continue
+        if len(cisla) >= 2:
+            data[nazvy[poradi]] = {"běžné": cisla[0], "minulé": cisla[1]}
+    return data
+
+def parsuj_uzaverku(pdf_filename, rezim=REZIM_TEXT):
+    """Vytěží data z PDF závěrky a vrátí slovník hodnot sloupců accounting_data (nebo None)"""
+    if rezim == REZIM_TABULKA:
+        radky = extrahuj_radky_z_pdf(pdf_filename)
+        text = "\n".join(text_radku(radek) for radek in radky)
+    else:
+        text = extract_text_from_pdf(pdf_filename)
+        radky = text.split('\n')
     if not text:
         print("Nepodařilo se extrahovat text, pravděpodobně se jedná o obrázek")
-        return
+        return None
 
     # Extracting company details
     ico = extrahuj_ico(text)
@@ -270,7 +403,7 @@ def zpracuj_uzaverku(pdf_filename):
         print("Nepodařilo se najít datum, použije se aktuální datum.")
         datum_str = datetime.now().strftime("%d.%m.%Y")
     
-    datum = datetime.strptime(datum_str, "%d.%m.%Y").date()
+    datum = parse_date(datum_str)
 
     # Detecting balance sheet type
     typ_rozvahy = detekuj_typ_rozvahy(text)
@@ -289,36 +422,20 @@ def zpracuj_uzaverku(pdf_filename):
     # Processing sections based on availability
     try:
         if index_aktiv != -1 and index_pasiv != -1:
-            data_aktiv_lines = lines[index_aktiv:index_pasiv]
+            data_aktiv_lines = radky[index_aktiv:index_pasiv]
             data_aktiv = zpracuj_sekci(data_aktiv_lines, mapa_aktiv, 4)
         else:
             print("Sekce AKTIV nenalezena.")
 
         if index_pasiv != -1 and (index_vzz == -1 or index_vzz > index_pasiv):
-            data_pasiv_lines = lines[index_pasiv:index_vzz] if index_vzz != -1 else lines[index_pasiv:]
+            data_pasiv_lines = radky[index_pasiv:index_vzz] if index_vzz != -1 else radky[index_pasiv:]
             data_pasiv = zpracuj_sekci(data_pasiv_lines, mapa_pasiv, 2)
         else:
             print("Sekce PASIV nenalezena.")
 
         if index_vzz != -1:
-            data_vzz_lines = lines[index_vzz:]
-            
-            # Odstranit speciální zpracování čistého obratu
-            for klíč, hodnota in mapa_vzz.items():
-                matching_lines = [line for line in data_vzz_lines if klíč in line]
-                if matching_lines:
-                    try:
-                        cisla = []
-                        for s in matching_lines[0].split():
-                            try:
-                                cislo = int(s.replace(" ", ""))
-                                cisla.append(cislo)
-                            except ValueError:
-                                continue
-                        if len(cisla) >= 2:
-                            data_vzz[hodnota] = {"běžné": cisla[0], "minulé": cisla[1]}
-                    except Exception as e:
-                        print(f"Chyba při zpracování {klíč}: {e}")
+            data_vzz_lines = radky[index_vzz:]
+            data_vzz = zpracuj_vzz(data_vzz_lines)
         else:
             print("Sekce Výkazu zisku a ztráty nenalezena.")
 
@@ -326,113 +443,158 @@ def zpracuj_uzaverku(pdf_filename):
         print(f"Obecná chyba při zpracování: {e}")
         print(traceback.format_exc())
 
-    # Create AccountingData with safety checks
-    accounting_data = AccountingData(
-        ico=ico,
-        běžné_účetní_období=datum,
-        
-        aktiva_celkem=data_aktiv.get("aktiva_celkem", {}).get("běžné"),
-        stálá_aktiva=data_aktiv.get("stálá_aktiva", {}).get("běžné"),
-        oběžná_aktiva=data_aktiv.get("oběžná_aktiva", {}).get("běžné"),
-        dlouhodobý_nehmotný_majetek=data_aktiv.get("dlouhodobý_nehmotný_majetek", {}).get("běžné"),
-        souftware=data_aktiv.get("software", {}).get("běžné"),
-        dlouhodobý_hmotný_majetek=data_aktiv.get("dlouhodobý_hmotný_majetek", {}).get("běžné"),
-        pozemky=data_aktiv.get("pozemky", {}).get("běžné"),
-        stavby=data_aktiv.get("stavby", {}).get("běžné"),
-        dlouhodobý_finanční_majetek=data_aktiv.get("dlouhodobý_finanční_majetek", {}).get("běžné"),
-        zásoby=data_aktiv.get("zásoby", {}).get("běžné"),
-        zboží=data_aktiv.get("zboží", {}).get("běžné"),
-        pohledávky=data_aktiv.get("pohledávky", {}).get("běžné"),
-        pohledávky_z_obchodních_vztahů=data_aktiv.get("pohledávky_z_obchodních_vztahů", {}).get("běžné"),
-        krátkodobý_finanční_majetek=data_aktiv.get("krátkodobý_finanční_majetek", {}).get("běžné"),
-        peněžní_prostředky_v_pokladně=data_aktiv.get("peněžní_prostředky_v_pokladně", {}).get("běžné"),
-        peněžní_prostředky_na_účtech=data_aktiv.get("peněžní_prostředky_na_účtech", {}).get("běžné"),
-        
-        pasiva_celkem=data_pasiv.get("pasiva_celkem", {}).get("běžné"),
-        vlastní_kapitál=data_pasiv.get("vlastní_kapitál", {}).get("běžné"),
-        základní_kapitál= data_pasiv.get("základní_kapitál", {}).get("běžné"),
-        kapitálové_fondy=data_pasiv.get("kapitálové_fondy", {}).get("běžné"),
-        fondy_ze_zisku=data_pasiv.get("fondy_ze_zisku", {}).get("běžné"),
-        výsledek_hospodaření_minulých_let=data_pasiv.get("výsledek_hospodaření_z_minulých_let", {}).get("běžné"),
-        cizí_zdroje=data_pasiv.get("cizí_zdroje", {}).get("běžné"),
-        dlouhodobé_závazky=data_pasiv.get("dlouhodobé_závazky", {}).get("běžné"),
-        dlouhodobé_závazky_k_úvěrovým_institucím=data_pasiv.get("dlouhodobé_závazky_k_úvěrovým_institucím", {}).get("běžné"),
-        dlouhodobé_závazky_z_obchodních_vztahů=data_pasiv.get("dlouhodobé_závazky_z_obchodních_vztahů", {}).get("běžné"),
-        krátkodobé_závazky=data_pasiv.get("krátkodobé_závazky", {}).get("běžné"),
-        krátkodobé_závazky_z_obchodních_vztahů=data_pasiv.get("krátkodobé_závazky_z_obchodních_vztahů", {}).get("běžné"),
-        krátkodobé_závazky_k_zaměstnancům=data_pasiv.get("krátkodobé_závazky_k_zaměstnancům", {}).get("běžné"),
-        krátkodobé_závazky_sociální_zabezpečení=data_pasiv.get("krátkodobé_závazky_sociální_zabezpečení", {}).get("běžné"),
-        krátkodobé_daňové_závazky=data_pasiv.get("krátkodobé_daňové_závazky", {}).get("běžné"),
-        # Financial Statement
-        tržby_výrobky_služby=data_vzz.get("tržby_výrobky_služby", {}).get("běžné"),
-        tržby_za_prodej_zboží=data_vzz.get("tržby_za_prodej_zboží", {}).get("běžné"),
-        výkonová_spotřeba=data_vzz.get("výkonová_spotřeba", {}).get("běžné"),
-        náklady_vynaložené_na_prodané_zboží=data_vzz.get("náklady_vynaložené_na_prodané_zboží", {}).get("běžné"),
-        spotřeba_materiálu_a_energie=data_vzz.get("spotřeba_materiálu_a_energie", {}).get("běžné"),
-        služby=data_vzz.get("služby", {}).get("běžné"),
-        změna_stavu_zásob_vlastní_činnosti=data_vzz.get("změna_stavu_zásob_vlastní_činnosti", {}).get("běžné"),
-        aktivace=data_vzz.get("aktivace", {}).get("běžné"),
-        osobní_náklady=data_vzz.get("osobní_náklady", {}).get("běžné"),
-        mzdové_náklady=data_vzz.get("mzdové_náklady", {}).get("běžné"),
-        náklady_na_sociální_zabezpečení_a_zdravotní_pojištění=data_vzz.get("náklady_na_sociální_zabezpečení_a_zdravotní_pojištění", {}).get("běžné"),
-        ostatní_náklady=data_vzz.get("ostatní_náklady", {}).get("běžné"),
-        úpravy_hodnot_v_provozní_oblasti=data_vzz.get("úpravy_hodnot_v_provozní_oblasti", {}).get("běžné"),
-        úpravy_dlouhodobého_nehmotného_a_hmotného_majetku=data_vzz.get("úpravy_dlouhodobého_nehmotného_a_hmotného_majetku", {}).get("běžné"),
-        úpravy_dlouhodobého_nehmotného_a_hmotného_majetku_trvalé=data_vzz.get("úpravy_dlouhodobého_nehmotného_a_hmotného_majetku_trvalé", {}).get("běžné"),
-        úpravy_dlouhodobého_nehmotného_a_hmotného_majetku_dočasné=data_vzz.get("úpravy_dlouhodobého_nehmotného_a_hmotného_majetku_dočasné", {}).get("běžné"),
-        úpravy_zásob=data_vzz.get("úpravy_zásob", {}).get("běžné"),
-        úpravy_pohledávek=data_vzz.get("úpravy_pohledávek", {}).get("běžné"),
-        ostatní_provozní_výnosy=data_vzz.get("ostatní_provozní_výnosy", {}).get("běžné"),
-        tržby_z_prodaného_dlouhodobého_majetku=data_vzz.get("tržby_z_prodaného_dlouhodobého_majetku", {}).get("běžné"),
-        tržby_z_prodaného_materiálu=data_vzz.get("tržby_z_prodaného_materiálu", {}).get("běžné"),
-        jiné_provozní_výnosy=data_vzz.get("jiné_provozní_výnosy", {}).get("běžné"),
-        ostatní_provozní_náklady=data_vzz.get("ostatní_provozní_náklady", {}).get("běžné"),
-        zůstatková_cena_prodaného_dlouhodobého_majetku=data_vzz.get("zůstatková_cena_prodaného_dlouhodobého_majetku", {}).get("běžné"),
-        prodaný_materiál=data_vzz.get("prodaný_materiál", {}).get("běžné"),
-        daně_a_poplatky=data_vzz.get("daně_a_poplatky", {}).get("běžné"),
-        rezervy_v_provozní_oblasti=data_vzz.get("rezervy_v_provozní_oblasti", {}).get("běžné"),
-        jiné_provozní_náklady=data_vzz.get("jiné_provozní_náklady", {}).get("běžné"),
-        čistý_obrat=data_vzz.get("čistý_obrat", {}).get("běžné"),
-        výnosy_z_dlouhodobého_finančního_majetku=data_vzz.get("výnosy_z_dlouhodobého_finančního_majetku", {}).get("běžné"),
-        výnosy_z_ostaního_dlouhodobého_finančního_majetku_nebo_ovládající_osoba=data_vzz.get("výnosy_z_ostaního_dlouhodobého_finančního_majetku_nebo_ovládající_osoba", {}).get("běžné"),
-        ostatní_výnosy_z_ostatního_dlouhodobého_finančního_majetku=data_vzz.get("ostatní_výnosy_z_ostatního_dlouhodobého_finančního_majetku", {}).get("běžné"),
-        náklady_související_s_ostatním_dlouhodobým_finančním_majetkem=data_vzz.get("náklady_související_s_ostatním_dlouhodobým_finančním_majetkem", {}).get("běžné"),
-        výnosové_úroky_a_podobné_výnosy=data_vzz.get("výnosové_úroky_a_podobné_výnosy", {}).get("běžné"),
-        výnosové_úroky_a_podobné_výnosy_ovládané_nebo_ovládající_osoba=data_vzz.get("výnosové_úroky_a_podobné_výnosy_ovládané_nebo_ovládající_osoba", {}).get("běžné"),
-        nákladové_úroky_a_podobné_náklady_ovládaná_nebo_ovládající_osoba=data_vzz.get("nákladové_úroky_a_podobné_náklady_ovládaná_nebo_ovládající_osoba", {}).get("běžné"),
-        ostatní_výnosové_úroky_a_podobné_výnosy=data_vzz.get("ostatní_výnosové_úroky_a_podobné_výnosy", {}).get("běžné"),
-        úpravy_hodnot_a_rezervy_ve_finanční_oblasti=data_vzz.get("úpravy_hodnot_a_rezervy_ve_finanční_oblasti", {}).get("běžné"),
-        nákladové_úroky_a_podobné_náklady=data_vzz.get("nákladové_úroky_a_podobné_náklady", {}).get("běžné"),
-        ostatní_nákladové_úroky_a_podobné_náklady=data_vzz.get("ostatní_nákladové_úroky_a_podobné_náklady", {}).get("běžné"),
-        ostatní_finanční_výnosy=data_vzz.get("ostatní_finanční_výnosy", {}).get("běžné"),
-        ostatní_finanční_náklady=data_vzz.get("ostatní_finanční_náklady", {}).get("běžné"),
-        finanční_výsledek_hospodaření=data_vzz.get("finanční_výsledek_hospodaření", {}).get("běžné"),
-        výsledek_hospodaření_před_zdaněním=data_vzz.get("výsledek_hospodaření_před_zdaněním", {}).get("běžné"),
-        daň_z_příjmů=data_vzz.get("daň_z_příjmů", {}).get("běžné"),
-        daň_z_příjmů_splatná=data_vzz.get("daň_z_příjmů_splatná", {}).get("běžné"),
-        daň_z_příjmů_odložená=data_vzz.get("daň_z_příjmů_odložená", {}).get("běžné"),
-        výsledek_hospodaření_po_zdanění=data_vzz.get("výsledek_hospodaření_po_zdanění", {}).get("běžné"),
-        převod_podílu_na_výsledku_hospodaření=data_vzz.get("převod_podílu_na_výsledku_hospodaření", {}).get("běžné"),
-        výsledek_hospodaření_za_účetní_období=data_vzz.get("výsledek_hospodaření_za_účetní_období", {}).get("běžné"),
-        čistý_obrat_za_účetní_období=data_vzz.get("čistý_obrat_za_účetní_období", {}).get("běžné"),
-    )
+    return sestav_radek(ico, datum, data_aktiv, data_pasiv, data_vzz)
+
+def zpracuj_uzaverku(pdf_filename, rezim=REZIM_TEXT):
+    row = parsuj_uzaverku(pdf_filename, rezim)
+    if row is None:
+        return None
+    ico, datum = row['ico'], row['běžné_účetní_období']
 
     # Uložení do databáze
-    db_conn = DatabaseConnection()
-    session = db_conn.get_session()
-    
     try:
-        session.add(accounting_data)
-        session.commit()
+        with DatabaseConnection.session_scope() as session:
+            upsert_davku(session, [row])
         print(f"Data pro IČO {ico} a datum {datum} úspěšně uložena do databáze.")
     except Exception as e:
-        session.rollback()
         print(f"Chyba při ukládání dat do databáze: {e}")
         print(traceback.format_exc())
-    finally:
-        session.close()
 
-    return accounting_data
+    return row
+
+# Chyba, kterou opakování nespraví (PDF je obrázek bez textové vrstvy)
+CHYBA_BEZ_TEXTU = "Nepodařilo se extrahovat text"
+
+def zpracuj_soubor(pdf_path, rezim=REZIM_TEXT):
+    """Zpracuje jeden soubor v pracovním procesu
+
+    Vrací (název souboru, hodnoty sloupců AccountingData nebo None, doba v sekundách, chyba).
+    """
+    start = time.perf_counter()
+    try:
+        row = parsuj_uzaverku(pdf_path, rezim)
+        if row is None:
+            return os.path.basename(pdf_path), None, time.perf_counter() - start, CHYBA_BEZ_TEXTU
+        return os.path.basename(pdf_path), row, time.perf_counter() - start, None
+    except Exception as e:
+        return os.path.basename(pdf_path), None, time.perf_counter() - start, str(e)
+
+# Přirozený klíč závěrky - odpovídá unikátnímu indexu ix_accounting_data_ico_obdobi
+KLIC_ZAVERKY = ('ico', 'běžné_účetní_období')
+
+def upsert_davku(session, rows):
+    """Vloží dávku jedním INSERT ... ON CONFLICT (ico, běžné_účetní_období) DO UPDATE
+
+    Opakované zpracování téže závěrky přepíše uložené hodnoty, takže nový
+    průchod celým archivem nevytvoří duplicity.
+    """
+    # Jeden INSERT nesmí stejný řádek aktualizovat dvakrát - v dávce vyhrává poslední výskyt
+    unikatni = {tuple(row[klic] for klic in KLIC_ZAVERKY): row for row in rows}
+    insert = sqlite_insert if session.get_bind().dialect.name == 'sqlite' else pg_insert
+    stmt = insert(AccountingData.__table__)
+    update_columns = {
+        column.name: stmt.excluded[column.name]
+        for column in AccountingData.__table__.columns
+        if not column.primary_key and column.name not in KLIC_ZAVERKY
+    }
+    stmt = stmt.on_conflict_do_update(index_elements=list(KLIC_ZAVERKY), set_=update_columns)
+    session.execute(stmt, list(unikatni.values()))
+
+def uloz_davku(rows):
+    """Uloží dávku řádků jedním hromadným upsertem, při chybě se ukládá po jednom řádku
+
+    Vrací počet uložených řádků.
+    """
+    try:
+        with DatabaseConnection.session_scope() as session:
+            upsert_davku(session, rows)
+        return len(rows)
+    except Exception as e:
+        print(f"Hromadné uložení dávky selhalo ({e}), ukládám po jednom řádku...")
+
+    saved = 0
+    for row in rows:
+        try:
+            with DatabaseConnection.session_scope() as session:
+                upsert_davku(session, [row])
+            saved += 1
+        except Exception as e:
+            print(f"Chyba při ukládání IČO {row.get('ico')}: {e}")
+    return saved
+
+def zpracuj_adresar(adresar=UZAVERKY_DIR, workers=None, batch_size=200, rezim=REZIM_TEXT):
+    """Zpracuje všechna PDF ve složce v poolu procesů a výsledky ukládá hromadným upsertem
+
+    Rozpracovaných souborů je nejvýš dvakrát víc než procesů, takže paměť nezávisí
+    na velikosti složky a chyba při ukládání zastaví zadávání dalších souborů.
+    """
+    pdf_paths = sorted(
+        os.path.join(adresar, filename)
+        for filename in os.listdir(adresar)
+        if filename.lower().endswith('.pdf')
+    )
+    workers = workers or os.cpu_count() or 1
+    print(f"Nalezeno {len(pdf_paths)} PDF souborů, zpracovávám v {workers} procesech")
+
+    start = time.perf_counter()
+    rows = []
+    failures = []
+    saved = 0
+
+    # Pracovní procesy nesmí používat spojení zděděná z rodiče
+    max_rozpracovanych = workers * 2
+    done = 0
+
+    def zpracuj_vysledky(futures):
+        nonlocal done, rows, saved
+        for future in futures:
+            done += 1
+            filename, row, duration, error = future.result()
+            if error:
+                failures.append((filename, error))
+                print(f"[{done}/{len(pdf_paths)}] {filename}: CHYBA za {duration:.2f} s - {error}")
+            else:
+                rows.append(row)
+                print(f"[{done}/{len(pdf_paths)}] {filename}: {duration:.2f} s")
+
+            if len(rows) >= batch_size:
+                saved += uloz_davku(rows)
+                rows = []
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=DatabaseConnection.dispose) as pool:
+        rozpracovane = set()
+        for pdf_path in pdf_paths:
+            if len(rozpracovane) >= max_rozpracovanych:
+                hotove, rozpracovane = wait(rozpracovane, return_when=FIRST_COMPLETED)
+                zpracuj_vysledky(hotove)
+            rozpracovane.add(pool.submit(zpracuj_soubor, pdf_path, rezim))
+        zpracuj_vysledky(wait(rozpracovane).done)
+
+    if rows:
+        saved += uloz_davku(rows)
+
+    elapsed = time.perf_counter() - start
+    print("\n" + "="*50)
+    print(f"Zpracováno souborů: {len(pdf_paths)}, uloženo řádků: {saved}, chyb: {len(failures)}")
+    if elapsed > 0:
+        print(f"Celkový čas: {elapsed:.1f} s, propustnost: {len(pdf_paths) / elapsed:.2f} souborů/s")
+    for filename, error in failures:
+        print(f"- {filename}: {error}")
+    return saved, failures
 
 # Spuštění
-zpracuj_uzaverku("24239445_30_3_2025.pdf")
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Zpracování PDF účetních závěrek do tabulky accounting_data")
+    parser.add_argument('soubory', nargs='*', help="Jednotlivé soubory; bez zadání se zpracuje celá složka")
+    parser.add_argument('--adresar', default=UZAVERKY_DIR)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--rezim', choices=REZIMY, default=REZIM_TEXT,
+                        help="text = řádky z extract_text(), tabulka = sloupce podle souřadnic slov")
+    args = parser.parse_args()
+
+    if args.soubory:
+        for soubor in args.soubory:
+            zpracuj_uzaverku(soubor, args.rezim)
+    else:
+        zpracuj_adresar(args.adresar, args.workers, args.batch_size, args.rezim)
@@ -0,0 +1,43 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+sys.path.append(os.path.join(ROOT_DIR, 'justice'))
+sys.path.append(os.path.join(ROOT_DIR, 'ares', 'scripts'))
+
+# Testy běží nad vlastní SQLite databází - adresa se musí nastavit před importem db
+os.environ['OBP_DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='obp_test_'), 'test.db')
+
+ARES_CSV = os.path.join(ROOT_DIR, 'res_export_2025-03-15-184623.csv')
+UKAZKOVA_ZAVERKA = os.path.join(ROOT_DIR, 'justice', 'uzaverky', '24239445_30_3_2025.pdf')
+
+@pytest.fixture
+def databaze():
+    """Prázdné schéma pro každý test"""
+    from db import Base, DatabaseConnection, init_schema
+    engine = DatabaseConnection.get_engine()
+    Base.metadata.drop_all(engine)
+    init_schema(engine)
+    return engine
+
+@pytest.fixture
+def ares_csv(tmp_path):
+    """Prvních 300 řádků exportu ARES z repozitáře"""
+    cesta = tmp_path / 'ares.csv'
+    with open(ARES_CSV, 'r', encoding='utf-8') as zdroj, open(cesta, 'w', encoding='utf-8', newline='') as cil:
+        for cislo, radek in enumerate(zdroj):
+            if cislo > 300:
+                break
+            cil.write(radek)
+    return str(cesta)
+
+@pytest.fixture
+def ares_data(databaze, ares_csv):
+    """Databáze naplněná ukázkovým exportem ARES"""
+    from import_data import import_from_csv
+    import_from_csv(ares_csv, mode='bulk')
+    return databaze
\ No newline at end of file
@@ -0,0 +1,109 @@
+from datetime import date, datetime, timedelta
+
+import crawl_status
+from db import AccountingData, AresData, CrawlStatus, DatabaseConnection
+
+ZDROJ = crawl_status.SOURCE_JUSTICE
+
+def _prvni_ico(pocet=1):
+    with DatabaseConnection.session_scope() as session:
+        return [ares.ico for ares in session.query(AresData).order_by(AresData.ico).limit(pocet)]
+
+def _nastav(ico, **hodnoty):
+    with DatabaseConnection.session_scope() as session:
+        session.query(CrawlStatus).filter_by(ico=ico, source=ZDROJ).update(hodnoty)
+
+def _stav(ico):
+    with DatabaseConnection.session_scope() as session:
+        zaznam = session.get(CrawlStatus, (ico, ZDROJ))
+        return zaznam.status, zaznam.next_check
+
+def test_prevedene_ico_bez_dokumentu_se_vrati_do_fronty(ares_data):
+    ico, = _prvni_ico()
+    assert crawl_status.mark_many(ZDROJ, [ico], crawl_status.STATUS_NO_DOCUMENT, today=date(2025, 1, 1)) == 1
+
+    status, next_check = _stav(ico)
+    assert status == crawl_status.STATUS_NO_DOCUMENT
+    assert next_check is not None
+
+    assert crawl_status.requeue_due(ZDROJ, today=next_check - timedelta(days=1)) == 0
+    assert crawl_status.requeue_due(ZDROJ, today=next_check) == 1
+    assert _stav(ico)[0] == crawl_status.STATUS_PENDING
+
+def test_prevedene_stazene_ico_ma_naplanovanou_kontrolu(ares_data):
+    ico, = _prvni_ico()
+    crawl_status.mark_many(ZDROJ, [ico], crawl_status.STATUS_DONE,
+                           filed_at={ico: date(2024, 6, 30)}, today=date(2025, 1, 1))
+
+    assert _stav(ico) == (crawl_status.STATUS_DONE, date(2025, 6, 30))
+    assert crawl_status.requeue_due(ZDROJ, today=date(2025, 6, 29)) == 0
+    assert crawl_status.requeue_due(ZDROJ, today=date(2025, 6, 30)) == 1
+
+def test_next_check_date():
+    dnes = date(2025, 1, 1)
+    # Lhůta pro závěrku za další rok: konec období + rok + 12 měsíců + rezerva
+    assert crawl_status.next_check_date(date(2023, 12, 31), None, dnes) == date(2025, 12, 31) + crawl_status.FILING_GRACE
+    # Bez období rok od podání
+    assert crawl_status.next_check_date(None, date(2024, 6, 30), dnes) == date(2025, 6, 30)
+    # Prošlá lhůta se posune o RECHECK_INTERVAL
+    assert crawl_status.next_check_date(date(2020, 12, 31), None, dnes) == dnes + crawl_status.RECHECK_INTERVAL
+    assert crawl_status.next_check_date(None, None, dnes) is None
+
+def test_no_document_check_date():
+    dnes = date(2025, 1, 1)
+    assert crawl_status.no_document_check_date(date(2024, 5, 1), dnes) == \
+        date(2024, 12, 31) + crawl_status.FILING_DEADLINE + crawl_status.FILING_GRACE
+    assert crawl_status.no_document_check_date(date(2001, 5, 1), dnes) == dnes + crawl_status.NO_DOCUMENT_INTERVAL
+    assert crawl_status.no_document_check_date(None, dnes) == dnes + crawl_status.NO_DOCUMENT_INTERVAL
+
+def test_claim_batch_podle_priority(ares_data):
+    icos = _prvni_ico(4)
+    assert crawl_status.seed_pending(ZDROJ, AresData.ico.in_(icos)) == 4
+    assert crawl_status.seed_pending(ZDROJ, AresData.ico.in_(icos)) == 0
+    _nastav(icos[2], priority=50)
+    _nastav(icos[3], priority=10)
+
+    assert crawl_status.claim_batch(ZDROJ, 2) == [icos[2], icos[3]]
+    # Převzatá IČO se znovu nevydají, IČO bez priority přijdou na řadu nakonec
+    assert sorted(crawl_status.claim_batch(ZDROJ, 10)) == icos[:2]
+    assert crawl_status.claim_batch(ZDROJ, 10) == []
+    assert _stav(icos[2])[0] == crawl_status.STATUS_IN_PROGRESS
+
+def test_claim_batch_opakuje_chyby_a_prosle_prevzeti(ares_data):
+    chybne, vycerpane, opustene = _prvni_ico(3)
+    crawl_status.seed_pending(ZDROJ, AresData.ico.in_([chybne, vycerpane, opustene]))
+    assert len(crawl_status.claim_batch(ZDROJ, 10)) == 3
+
+    crawl_status.mark_result(chybne, ZDROJ, crawl_status.STATUS_FAILED)
+    crawl_status.mark_result(vycerpane, ZDROJ, crawl_status.STATUS_FAILED)
+    _nastav(vycerpane, attempts=crawl_status.MAX_ATTEMPTS)
+    _nastav(opustene, last_attempt=datetime.now() - crawl_status.LEASE_TIMEOUT - timedelta(minutes=1))
+
+    assert sorted(crawl_status.claim_batch(ZDROJ, 10)) == sorted([chybne, opustene])
+
+def test_release_nezapocita_pokus(ares_data):
+    ico, = _prvni_ico()
+    crawl_status.seed_pending(ZDROJ, AresData.ico == ico)
+    crawl_status.claim_batch(ZDROJ)
+    crawl_status.release(ico, ZDROJ)
+    with DatabaseConnection.session_scope() as session:
+        zaznam = session.get(CrawlStatus, (ico, ZDROJ))
+        assert (zaznam.status, zaznam.attempts) == (crawl_status.STATUS_PENDING, 0)
+
+def test_hotove_ico_se_vrati_po_novem_obdobi(ares_data):
+    ico, = _prvni_ico()
+    crawl_status.seed_pending(ZDROJ, AresData.ico == ico)
+    crawl_status.claim_batch(ZDROJ)
+    crawl_status.mark_result(ico, ZDROJ, crawl_status.STATUS_DONE, filed_at=date(2020, 6, 30))
+    with DatabaseConnection.session_scope() as session:
+        session.add(AccountingData(ico=ico, běžné_účetní_období=date(2020, 12, 31)))
+
+    assert crawl_status.sync_latest_periods(ZDROJ) == 1
+    assert crawl_status.sync_latest_periods(ZDROJ) == 0
+    status, next_check = _stav(ico)
+    assert status == crawl_status.STATUS_DONE
+    assert next_check == date.today() + crawl_status.RECHECK_INTERVAL
+
+    assert crawl_status.requeue_due(ZDROJ) == 0
+    assert crawl_status.requeue_due(ZDROJ, today=next_check) == 1
+    assert crawl_status.claim_batch(ZDROJ) == [ico]
\ No newline at end of file
@@ -0,0 +1,18 @@
+from datetime import date
+
+import pytest
+
+from dates import parse_date
+
+@pytest.mark.parametrize('text, ocekavane', [
+    ('2025-02-28', date(2025, 2, 28)),
+    ('31.12.2024', date(2024, 12, 31)),
+    ('1.1.2024', date(2024, 1, 1)),
+    ('2024-02-30', None),
+    ('30.2.2024', None),
+    ('', None),
+    (None, None),
+    ('neplatné', None),
+])
+def test_parse_date(text, ocekavane):
+    assert parse_date(text) == ocekavane
\ No newline at end of file
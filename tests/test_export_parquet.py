@@ -0,0 +1,28 @@
+from datetime import date
+
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+ds = pytest.importorskip('pyarrow.dataset')
+
+from db import AccountingData, AresData, DatabaseConnection
+from export_parquet import export_parquet
+
+def test_export_a_zpetne_nacteni(ares_data, tmp_path):
+    with DatabaseConnection.session_scope() as session:
+        icos = [ares.ico for ares in session.query(AresData).order_by(AresData.ico).limit(2)]
+        session.add(AccountingData(ico=icos[0], běžné_účetní_období=date(2023, 12, 31), aktiva_celkem=100.0))
+        session.add(AccountingData(ico=icos[1], běžné_účetní_období=date(2024, 12, 31), aktiva_celkem=200.0))
+        pocet_ares = session.query(AresData).count()
+
+    assert export_parquet(export_dir=str(tmp_path), batch_size=50)
+
+    partitioning = ds.partitioning(flavor='hive')
+    ares = ds.dataset(str(tmp_path / 'ares_data'), format='parquet', partitioning=partitioning).to_table()
+    assert ares.num_rows == pocet_ares
+    assert 'kraj_kod' in ares.column_names
+
+    zaverky = ds.dataset(str(tmp_path / 'accounting_data'), format='parquet', partitioning=partitioning).to_table()
+    radky = sorted(zip(zaverky['ico'].to_pylist(), zaverky['rok'].to_pylist(), zaverky['aktiva_celkem'].to_pylist()))
+    assert radky == [(icos[0], 2023, 100.0), (icos[1], 2024, 200.0)]
+    assert (tmp_path / 'accounting_data' / 'rok=2023').is_dir()
\ No newline at end of file
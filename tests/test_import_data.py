@@ -0,0 +1,73 @@
+import csv
+
+import pytest
+
+from db import AresData, Base, DatabaseConnection, init_schema
+from import_data import compile_header, convert_row, import_from_csv, import_from_csv_parallel, row_hash
+
+def _obsah():
+    with DatabaseConnection.session_scope() as session:
+        return sorted(
+            (ares.ico, ares.obchodni_jmeno, ares.datum_vzniku, ares.kraj_kod,
+             ares.statisticka_pravni_forma_kod, ares.hash_zaznamu)
+            for ares in session.query(AresData)
+        )
+
+def _pocet_radku(cesta):
+    with open(cesta, 'r', encoding='utf-8') as f:
+        return sum(1 for _ in csv.reader(f)) - 1
+
+@pytest.fixture
+def ocekavany_obsah(databaze, ares_csv):
+    import_from_csv(ares_csv, mode='bulk')
+    obsah = _obsah()
+    Base.metadata.drop_all(databaze)
+    init_schema(databaze)
+    return obsah
+
+def test_bulk_nacte_vsechny_radky(ares_data, ares_csv):
+    obsah = _obsah()
+    assert len(obsah) == _pocet_radku(ares_csv)
+    assert all(hash_zaznamu for *_, hash_zaznamu in obsah)
+
+@pytest.mark.parametrize('rezim', ['orm', 'incremental'])
+def test_rezimy_importu_davaji_stejny_vysledek(ocekavany_obsah, ares_csv, rezim):
+    import_from_csv(ares_csv, mode=rezim, batch_size=70)
+    assert _obsah() == ocekavany_obsah
+
+def test_paralelni_import_po_usecich(ocekavany_obsah, ares_csv):
+    import_from_csv_parallel(ares_csv, workers=2, batch_size=70, chunk_size=4096)
+    assert _obsah() == ocekavany_obsah
+
+def test_hash_ignoruje_datum_platnosti():
+    hlavicka = ['IČO', 'Obchodní jméno/název', 'Datum platnosti', 'Datum vzniku']
+    plan = compile_header(hlavicka)
+    prvni = convert_row(plan, ['00000001', '"Firma s.r.o."', '2025-02-28', '2017-01-18'])
+    druhy = convert_row(plan, ['00000001', '"Firma s.r.o."', '2025-03-31', '2017-01-18'])
+    zmeneny = convert_row(plan, ['00000001', '"Firma a.s."', '2025-03-31', '2017-01-18'])
+
+    assert prvni['obchodni_jmeno'] == 'Firma s.r.o.'
+    assert prvni['hash_zaznamu'] == druhy['hash_zaznamu'] == row_hash(druhy)
+    assert prvni['hash_zaznamu'] != zmeneny['hash_zaznamu']
+
+def test_prirustkovy_import_preskoci_nezmenene(ares_data, ares_csv, tmp_path):
+    pocet = len(_obsah())
+    souhrn = import_from_csv(ares_csv, mode='incremental')
+    assert souhrn == {'inserted': 0, 'updated': 0, 'unchanged': _pocet_radku(ares_csv), 'vanished': 0}
+
+    # Změněný název prvního řádku a chybějící poslední řádek
+    with open(ares_csv, 'r', encoding='utf-8', newline='') as f:
+        radky = list(csv.reader(f))
+    radky[1][1] = radky[1][1] + ' v likvidaci'
+    radky.pop()
+    upraveny = tmp_path / 'upraveny.csv'
+    with open(upraveny, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerows(radky)
+
+    souhrn = import_from_csv(str(upraveny), mode='incremental')
+    assert souhrn['updated'] == 1
+    assert souhrn['inserted'] == 0
+    assert souhrn['vanished'] == 1
+    with DatabaseConnection.session_scope() as session:
+        assert session.get(AresData, radky[1][0]).obchodni_jmeno.endswith(' v likvidaci')
+        assert session.query(AresData).count() == pocet
\ No newline at end of file
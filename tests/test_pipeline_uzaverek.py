@@ -0,0 +1,71 @@
+import os
+import shutil
+
+import pytest
+
+pytest.importorskip('pdfplumber')
+
+from conftest import UKAZKOVA_ZAVERKA
+from db import AccountingData, DatabaseConnection
+from pipeline_uzaverek import nacti_chyby, nacti_postup, najdi_soubory, spust_pipeline, vyrazene_soubory
+
+def _pocet_zaverek():
+    with DatabaseConnection.session_scope() as session:
+        return session.query(AccountingData).count()
+
+@pytest.fixture
+def adresar(tmp_path):
+    """Složka s ukázkovou závěrkou a poškozeným PDF"""
+    adresar = tmp_path / 'uzaverky'
+    adresar.mkdir()
+    shutil.copy(UKAZKOVA_ZAVERKA, adresar)
+    (adresar / 'poskozena.pdf').write_bytes(b'%PDF-1.4 poskozeny soubor')
+    return adresar
+
+def _spust(adresar, tmp_path, max_pokusu=2):
+    return spust_pipeline(str(adresar), workers=1, batch_size=10,
+                          soubor_postupu=str(tmp_path / 'postup.txt'),
+                          soubor_chyb=str(tmp_path / 'chyby.txt'), max_pokusu=max_pokusu)
+
+def test_nacti_postup_zahodi_useknuty_radek(tmp_path):
+    soubor = tmp_path / 'postup.txt'
+    soubor.write_text('a.pdf\nb.pdf\nc.p', encoding='utf-8')
+    assert nacti_postup(str(soubor)) == {'a.pdf', 'b.pdf'}
+    assert nacti_postup(str(tmp_path / 'neexistuje.txt')) == set()
+
+def test_nacti_chyby_pocita_jen_posledni_verzi(tmp_path):
+    soubor = tmp_path / 'chyby.txt'
+    soubor.write_text('a.pdf\t1.0\na.pdf\t1.0\nb.pdf\t1.0\nb.pdf\t2.0\nc.pdf\t1', encoding='utf-8')
+    chyby = nacti_chyby(str(soubor))
+    assert chyby == {'a.pdf': (2, 1.0), 'b.pdf': (1, 2.0)}
+    assert vyrazene_soubory(chyby, 2) == {'a.pdf': 1.0}
+
+def test_najdi_soubory(adresar):
+    nazev = os.path.basename(UKAZKOVA_ZAVERKA)
+    vse = {os.path.basename(cesta) for cesta in najdi_soubory(str(adresar), set())}
+    assert vse == {nazev, 'poskozena.pdf'}
+    assert [os.path.basename(cesta) for cesta in najdi_soubory(str(adresar), {nazev})] == ['poskozena.pdf']
+
+    mtime = os.path.getmtime(adresar / 'poskozena.pdf')
+    assert list(najdi_soubory(str(adresar), {nazev}, {'poskozena.pdf': mtime})) == []
+    # Změněný soubor se zkusí znovu
+    os.utime(adresar / 'poskozena.pdf', (mtime + 10, mtime + 10))
+    assert len(list(najdi_soubory(str(adresar), {nazev}, {'poskozena.pdf': mtime}))) == 1
+
+def test_pipeline_pokracuje_od_ulozeneho_postupu(databaze, adresar, tmp_path):
+    statistiky = _spust(adresar, tmp_path)
+    assert statistiky['zpracovano'] == 2
+    assert statistiky['ulozeno'] == 1
+    assert list(statistiky['chyby']) == ['poskozena.pdf']
+    assert nacti_postup(str(tmp_path / 'postup.txt')) == {os.path.basename(UKAZKOVA_ZAVERKA)}
+    assert _pocet_zaverek() == 1
+
+    # Hotová závěrka se znovu nezpracuje, poškozené PDF se zkouší do max_pokusu
+    assert _spust(adresar, tmp_path)['zpracovano'] == 1
+    assert _spust(adresar, tmp_path)['zpracovano'] == 0
+    assert _pocet_zaverek() == 1
+
+    # Po změně souboru se poškozené PDF zkusí znovu
+    mtime = os.path.getmtime(adresar / 'poskozena.pdf')
+    os.utime(adresar / 'poskozena.pdf', (mtime + 10, mtime + 10))
+    assert _spust(adresar, tmp_path)['zpracovano'] == 1
\ No newline at end of file
@@ -0,0 +1,60 @@
+import pytest
+
+from radky_vykazu import RadekVykazu, normalizuj_kod, radky_ze_slov, rozloz_radek, seskup_cisla
+
+@pytest.mark.parametrize('tokeny, pocet, ocekavane', [
+    # Hladové seskupení tisíců
+    (['1', '234', '567', '12'], None, [['1', '234', '567'], ['12']]),
+    (['1', '234', '567', '12'], 2, [['1', '234', '567'], ['12']]),
+    # Očekávaný počet sloupců rozhodne nejednoznačné seskupení
+    (['1', '234', '567', '12'], 3, [['1', '234'], ['567'], ['12']]),
+    # Nula nezačíná tisícovou skupinu
+    (['0', '123'], None, [['0'], ['123']]),
+    (['-5', '000', '7'], None, [['-5', '000'], ['7']]),
+    # Rozdělení na požadovaný počet neexistuje - vrátí se hladové seskupení
+    (['5'], 2, [['5']]),
+])
+def test_seskup_cisla(tokeny, pocet, ocekavane):
+    assert seskup_cisla(tokeny, pocet) == ocekavane
+
+@pytest.mark.parametrize('radek, pocet, ocekavane', [
+    ("A.II.1. Pozemky 1 234 567 12 345 1 222 222 1 000 000", 4,
+     RadekVykazu('A.II.1.', 'Pozemky', (1234567, 12345, 1222222, 1000000))),
+    ("B. Oběžná aktiva 123 456", 1, RadekVykazu('B.', 'Oběžná aktiva', (123456,))),
+    ("C.I.+D. Součet 1 2", 2, RadekVykazu('C.I.+D.', 'Součet', (1, 2))),
+    ("* Výsledek hospodaření -1 234", 1, RadekVykazu('*', 'Výsledek hospodaření', (-1234,))),
+    ("AKTIVA CELKEM", None, RadekVykazu(None, 'AKTIVA CELKEM', ())),
+])
+def test_rozloz_radek(radek, pocet, ocekavane):
+    assert rozloz_radek(radek, pocet) == ocekavane
+
+def test_normalizuj_kod():
+    assert normalizuj_kod("A.1.") == normalizuj_kod("A.1") == "A.1"
+    assert normalizuj_kod("* ") == "*"
+
+def _slovo(text, x0, top, sirka=None):
+    return {'text': text, 'x0': x0, 'x1': x0 + (sirka or 5 * len(text)), 'top': top, 'bottom': top + 10}
+
+def test_radky_ze_slov_podle_sloupcu():
+    slova = [
+        # Hlavička sloupců, čísla jsou zarovnaná vpravo pod ní
+        _slovo('1', 200, 0), _slovo('2', 300, 0),
+        _slovo('B.', 10, 20), _slovo('Zásoby', 30, 20), _slovo('1', 190, 20), _slovo('234', 197, 20), _slovo('7', 300, 20),
+        # Prázdná první buňka neposune druhou hodnotu
+        _slovo('C.', 10, 40), _slovo('Pohledávky', 30, 40), _slovo('50', 295, 40),
+    ]
+    radky, sloupce = radky_ze_slov(slova)
+    assert radky == [
+        RadekVykazu('B.', 'Zásoby', (1234, 7)),
+        RadekVykazu('C.', 'Pohledávky', (None, 50)),
+    ]
+    assert len(sloupce) == 2
+
+def test_radky_ze_slov_bez_hlavicky_a_nadpis_sekce():
+    slova = [_slovo('B.', 10, 0), _slovo('Zásoby', 30, 0), _slovo('1', 175, 0), _slovo('234', 181, 0)]
+    radky, sloupce = radky_ze_slov(slova, sloupce=None)
+    assert radky == [RadekVykazu('B.', 'Zásoby', (1234,))]
+    assert sloupce is None
+
+    radky, sloupce = radky_ze_slov([_slovo('PASIVA', 10, 0)], sloupce=[202.5, 302.5])
+    assert sloupce is None
\ No newline at end of file
@@ -11,10 +11,6 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from db import DatabaseConnection, AresData, WebData
 
-# Připojení k databázi
-db = DatabaseConnection()
-session = db.get_session()
-
 def random_sleep(min_sec=1, max_sec=3):
     time.sleep(random.uniform(min_sec, max_sec))
 
@@ -171,32 +167,37 @@ def process_company(driver, company, proxy_rotator):
         print(f"Chybí jméno pro IČO {ico}")
         return None
     
-    existing_web = session.query(WebData).filter_by(ico=ico).first()
-    if existing_web and existing_web.url:
-        print(f"Web již existuje: {existing_web.url}")
-        return existing_web.url
+    with DatabaseConnection.session_scope() as session:
+        existing_web = session.query(WebData).filter_by(ico=ico).first()
+        has_record = existing_web is not None
+        existing_url = existing_web.url if existing_web else None
+    if existing_url:
+        print(f"Web již existuje: {existing_url}")
+        return existing_url
     
     print(f"Zpracovávám: {name} (IČO: {ico})")
     website = find_company_website(driver, name)
     
     if website:
         print(f"Nalezen web: {website}")
-        if existing_web:
-            existing_web.url = website
-        else:
-            session.add(WebData(ico=ico, url=website))
-        session.commit()
+        with DatabaseConnection.session_scope() as session:
+            existing_web = session.query(WebData).filter_by(ico=ico).first()
+            if existing_web:
+                existing_web.url = website
+            else:
+                session.add(WebData(ico=ico, url=website))
     else:
-        if not existing_web:
-            session.add(WebData(ico=ico, url=None))
-            session.commit()
+        if not has_record:
+            with DatabaseConnection.session_scope() as session:
+                session.add(WebData(ico=ico, url=None))
     
     return website
 
 def main():
-    companies = session.query(AresData).join(WebData, AresData.ico == WebData.ico, isouter=True).filter(
-        (WebData.ico == None) & (AresData.obchodni_jmeno != None)
-    ).limit(50).all()
+    with DatabaseConnection.session_scope() as session:
+        companies = session.query(AresData.ico, AresData.obchodni_jmeno).join(WebData, AresData.ico == WebData.ico, isouter=True).filter(
+            (WebData.ico == None) & (AresData.obchodni_jmeno != None)
+        ).limit(50).all()
     
     if not companies:
         print("Žádné firmy k zpracování.")
@@ -13,11 +13,13 @@ from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import exists
+
 from db import DatabaseConnection, AresData, WebData
+import crawl_status
 
-# Inicializace připojení k databázi
-db = DatabaseConnection()
-session = db.get_session()
+# Počet firem převzatých z fronty na jedno spuštění
+CLAIM_BATCH_SIZE = 50
 
 # Funkce pro náhodné čekání
 def random_sleep(min_sec=1, max_sec=3):
@@ -415,10 +417,13 @@ def process_company(driver, company, proxy_rotator=None, current_proxy=None):
     print(f"Zpracovávám firmu: {company_name} (IČO: {ico})")
     
     # Kontrola, zda už nemáme web v databázi
-    existing_web = session.query(WebData).filter_by(ico=ico).first()
-    if existing_web and existing_web.url:
-        print(f"Web pro IČO {ico} již existuje v databázi: {existing_web.url}")
-        return existing_web.url
+    with DatabaseConnection.session_scope() as session:
+        existing_web = session.query(WebData).filter_by(ico=ico).first()
+        has_record = existing_web is not None
+        existing_url = existing_web.url if existing_web else None
+    if existing_url:
+        print(f"Web pro IČO {ico} již existuje v databázi: {existing_url}")
+        return existing_url
     
     # Kontrola, zda driver není None
     if driver is None:
@@ -428,33 +433,45 @@ def process_company(driver, company, proxy_rotator=None, current_proxy=None):
     # Hledáme web přímo na Google
     website = find_company_website_google(driver, company_name, proxy_rotator, current_proxy)
     
-    # Uložení do databáze
+    # Uložení do databáze - nová krátká session, spojení se nedrží během hledání na Google
     if website:
         print(f"Nalezen web pro IČO {ico}: {website}")
-        if existing_web:
-            existing_web.url = website
-        else:
-            web_data = WebData(ico=ico, url=website)
-            session.add(web_data)
-        
-        session.commit()
+        with DatabaseConnection.session_scope() as session:
+            existing_web = session.query(WebData).filter_by(ico=ico).first()
+            if existing_web:
+                existing_web.url = website
+            else:
+                web_data = WebData(ico=ico, url=website)
+                session.add(web_data)
     else:
         print(f"Web pro firmu '{company_name}' (IČO {ico}) nebyl nalezen")
         # Přesto vytvoříme záznam s prázdnou URL, abychom věděli, že jsme tuto firmu již zpracovali
-        if not existing_web:
-            web_data = WebData(ico=ico, url=None)
-            session.add(web_data)
-            session.commit()
+        if not has_record:
+            with DatabaseConnection.session_scope() as session:
+                web_data = WebData(ico=ico, url=None)
+                session.add(web_data)
     
     return website
 
 def main():
     """Hlavní funkce skriptu"""
-    companies = session.query(AresData).join(
-        WebData, AresData.ico == WebData.ico, isouter=True
-    ).filter(
-        (WebData.ico == None) & (AresData.obchodni_jmeno != None)
-    ).limit(50).all()
+    # Fronta firem bez webu je sdílená v databázi, více pracovníků dostane různé firmy
+    try:
+        crawl_status.seed_pending(
+            crawl_status.SOURCE_WEB,
+            AresData.obchodni_jmeno != None,
+            ~exists().where(WebData.ico == AresData.ico),
+        )
+        icos = crawl_status.claim_batch(crawl_status.SOURCE_WEB, CLAIM_BATCH_SIZE)
+    except Exception as e:
+        print(f"Nepodařilo se převzít firmy z fronty v databázi: {e}")
+        return
+
+    # Načítáme jen potřebné sloupce, řádky zůstanou použitelné i po zavření session
+    with DatabaseConnection.session_scope() as session:
+        companies = session.query(AresData.ico, AresData.obchodni_jmeno).filter(
+            AresData.ico.in_(icos)
+        ).all()
     
     if not companies:
         print("V databázi nejsou žádné firmy bez webu nebo všechny firmy již byly zpracovány!")
@@ -490,6 +507,8 @@ def main():
     
     current_proxy = None
     driver = None
+    # Převzaté firmy, které ještě nejsou zpracované - při ukončení se vrátí do fronty
+    claimed = set(icos)
     
     try:
         for company in companies:
@@ -531,6 +550,15 @@ def main():
             
             if website:
                 success_count += 1
+            try:
+                crawl_status.mark_result(
+                    company.ico,
+                    crawl_status.SOURCE_WEB,
+                    crawl_status.STATUS_DONE if website else crawl_status.STATUS_NO_DOCUMENT,
+                )
+                claimed.discard(company.ico)
+            except Exception as e:
+                print(f"Chyba při ukládání stavu IČO {company.ico}: {e}")
             
             if driver and detect_captcha(driver):
                 captcha_count += 1
@@ -538,7 +566,8 @@ def main():
             random_sleep(3, 10)
         
         print("\nZpracování dokončeno! Výsledky:")
-        results = session.query(WebData).filter(WebData.ico.in_([c.ico for c in companies])).all()
+        with DatabaseConnection.session_scope() as session:
+            results = session.query(WebData.ico, WebData.url).filter(WebData.ico.in_([c.ico for c in companies])).all()
         for result in results:
             print(f"IČO: {result.ico}, Web: {result.url or 'Nenalezen'}")
             
@@ -556,6 +585,11 @@ def main():
         if driver:
             driver.quit()
             print("Webdriver byl ukončen")
+        for ico in claimed:
+            try:
+                crawl_status.release(ico, crawl_status.SOURCE_WEB)
+            except Exception as e:
+                print(f"Nepodařilo se uvolnit IČO {ico}: {e}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file